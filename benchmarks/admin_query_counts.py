@@ -0,0 +1,165 @@
+"""Queries per admin changelist page, with few rows and with a full page.
+
+Usage: python benchmarks/admin_query_counts.py [--rows 5] [--more 60]
+
+Runs against a throw-away test database of the configured engine. Every
+LeanModelAdmin changelist is requested with --rows rows and again with
+--more rows; the number of queries must not change, and no SELECT of the
+listed rows may load a wide column (text, CKEditor body, JSON) that is not
+shown, neither of the model nor of a joined foreign key.
+Exits with status 1 when one does.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib import admin  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from core import models  # noqa: E402
+from core.admin import WIDE_COLUMN_TYPES, LeanModelAdmin  # noqa: E402
+
+BODY = '<p>' + 'Lorem ipsum dolor sit amet. ' * 200 + '</p>'
+
+
+def factories(user, hostel):
+    """model -> function creating one row; singletons are left out."""
+    return {
+        models.News: lambda i: models.News(user=user, header_ja=f'News {i}', content_ja=BODY, image='news/x.jpg'),
+        models.Video: lambda i: models.Video(user=user, header_ja=f'Video {i}', link='https://example.com/'),
+        models.Job: lambda i: models.Job(
+            user=user, header_ja=f'Job {i}', attract_point_ja='-', content_ja=BODY,
+        ),
+        models.TeamMember: lambda i: models.TeamMember(
+            user=user, name_en=f'Member {i}', name_ja='-', position_en='-', position_ja='-', blog_en=BODY,
+        ),
+        models.Service: lambda i: models.Service(
+            user=user, icon='bi-house', title_en=f'Service {i}', description_en=BODY,
+        ),
+        models.Hostel: lambda i: models.Hostel(
+            user=user, name_en=f'Hostel {i}', address_en='-', features_en=BODY, price_per_month=Decimal(1),
+        ),
+        models.BookingRequest: lambda i: models.BookingRequest(
+            hostel=hostel, customer_name=f'Customer {i}', phone_number='0', current_address='-',
+            email='a@example.com', message=BODY,
+        ),
+        models.ContactMessage: lambda i: models.ContactMessage(
+            name=f'Visitor {i}', email='a@example.com', phone='0', purpose='-', message=BODY,
+        ),
+        models.FAQ: lambda i: models.FAQ(user=user, question_en=f'Question {i}', answer_en=BODY),
+    }
+
+
+def fill(model, make, rows):
+    missing = rows - model.objects.count()
+    if missing > 0:
+        model.objects.bulk_create([make(i) for i in range(missing)])
+
+
+def unshown_wide_columns(model_admin, request):
+    """'"table"."column"' of the wide columns the page does not show.
+
+    Those of the model outside list_display and list_columns, and all of
+    the joined foreign keys': str() of a related row needs no text bodies.
+    """
+    list_display = model_admin.get_list_display(request)
+    shown = {*list_display, *(model_admin.list_columns or ())}
+    opts = model_admin.model._meta
+    columns = [
+        f'"{opts.db_table}"."{field.column}"' for field in opts.concrete_fields
+        if field.get_internal_type() in WIDE_COLUMN_TYPES and field.name not in shown
+    ]
+    for field in opts.concrete_fields:
+        if field.many_to_one and field.name in list_display:
+            related = field.related_model._meta
+            columns += [
+                f'"{related.db_table}"."{column.column}"' for column in related.concrete_fields
+                if column.get_internal_type() in WIDE_COLUMN_TYPES
+            ]
+    return columns
+
+
+def measure(client, model_admin, request):
+    opts = model_admin.model._meta
+    url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    if response.status_code != 200:
+        raise ValueError(f'{url} returned {response.status_code}')
+    table = f'FROM "{opts.db_table}"'
+    wide = [
+        query['sql'] for query in queries.captured_queries
+        if table in query['sql'] and 'COUNT(' not in query['sql']
+        and any(column in query['sql'].split(' FROM ')[0] for column in unshown_wide_columns(model_admin, request))
+    ]
+    return len(queries), wide
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5)
+    parser.add_argument('--more', type=int, default=60, help="At most list_per_page (100) to stay on one page.")
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'admin.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    ok = True
+    try:
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin')
+        client = Client()
+        client.force_login(user)
+        hostel = models.Hostel.objects.create(
+            user=user, name_en='Hostel', address_en='-', features_en=BODY, price_per_month=Decimal(1),
+        )
+        models.CompanyInfo.objects.create(
+            user=user, name_en='Fishtail', establishment_date=date(2020, 1, 1), representative_en='-',
+            capital='-', employees_num=1, business_portfolio_en=BODY, office_address_en='-', office_tel='0',
+            license_details_en='-', about_en=BODY, business_hours_en='-', mission_en=BODY, vision_en=BODY,
+            values_en=BODY,
+        )
+        models.TermsAndConditions.objects.create(content_en=BODY)
+        make = factories(user, hostel)
+        request = client.get('/').wsgi_request
+        request.user = user
+
+        for model, model_admin in admin.site._registry.items():
+            if not isinstance(model_admin, LeanModelAdmin):
+                continue
+            counts = []
+            for rows in (args.rows, args.more):
+                if model in make:
+                    fill(model, make[model], rows)
+                count, wide = measure(client, model_admin, request)
+                counts.append(count)
+                for sql in wide:
+                    ok = False
+                    print(f"  {model.__name__}: loads a wide column it does not show: {sql[:200]}")
+            constant = counts[0] == counts[1]
+            ok = ok and constant
+            shown = f"{counts[0]} -> {counts[1]} queries" if model in make else f"{counts[0]} queries (one row)"
+            print(f"{model.__name__:<20} {shown}{'' if constant else '  NOT CONSTANT'}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
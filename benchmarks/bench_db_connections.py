@@ -0,0 +1,107 @@
+"""Requests per second with a new connection per request, persistent connections and a pool.
+
+Usage: python benchmarks/bench_db_connections.py [--threads 8] [--requests 200]
+
+Renders the public pages through the full middleware stack, from several
+threads at once, against the configured database (it only reads, so point
+it at a migrated local database with some content):
+
+    DATABASE_ENGINE=django.db.backends.postgresql DATABASE_NAME=fishtail ... \\
+        python benchmarks/bench_db_connections.py
+
+Each mode runs in a fresh process with the page cache off:
+
+    per-request  DATABASE_CONN_MAX_AGE=0
+    persistent   DATABASE_CONN_MAX_AGE=60
+    pool         DATABASE_POOL=True (PostgreSQL with psycopg[pool] only)
+
+and the pool mode prints the pool's checkout statistics.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+MODES = {
+    'per-request': {'DATABASE_CONN_MAX_AGE': '0', 'DATABASE_POOL': 'False'},
+    'persistent': {'DATABASE_CONN_MAX_AGE': '60', 'DATABASE_POOL': 'False'},
+    'pool': {'DATABASE_POOL': 'True'},
+}
+PAGES = ('/en/', '/en/news/', '/en/hostel/', '/en/faq/', '/en/team/')
+
+
+def run(threads, requests):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.db import connections
+    from django.test import Client
+
+    from core.db import connection_stats
+
+    settings.ALLOWED_HOSTS = ['*']
+    errors = []
+
+    def worker():
+        client = Client()
+        try:
+            for i in range(requests):
+                response = client.get(PAGES[i % len(PAGES)])
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'rps': threads * requests / elapsed,
+        'errors': len(errors),
+        'pool': connection_stats()['default'].get('pool'),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per thread.")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run(args.threads, args.requests)
+        return
+
+    postgresql = os.environ.get('DATABASE_ENGINE') == 'django.db.backends.postgresql'
+    for mode, env in MODES.items():
+        if mode == 'pool' and not postgresql:
+            print(f"{mode:<12} skipped (PostgreSQL only)")
+            continue
+        result = subprocess.run(
+            [sys.executable, __file__, '--child', '--threads', str(args.threads), '--requests', str(args.requests)],
+            env={**os.environ, **env, 'CACHE_BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            print(f"{mode:<12} failed:\n{result.stderr}")
+            continue
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{mode:<12} {stats['rps']:8.1f} requests/s  {stats['errors']} errors")
+        if stats['pool']:
+            pool = stats['pool']
+            print(f"{'':<12} {pool.get('requests_num', 0)} checkouts, {pool.get('requests_queued', 0)} waited, "
+                  f"{pool['checkout_wait_ms_avg']} ms average wait, {pool.get('connections_num', 0)} connections opened")
+
+
+if __name__ == '__main__':
+    main()
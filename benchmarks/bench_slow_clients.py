@@ -0,0 +1,170 @@
+"""WSGI (gunicorn) against ASGI (uvicorn) with many slow clients connected.
+
+Usage: python benchmarks/bench_slow_clients.py [--servers wsgi asgi] [--workers 2]
+           [--clients 1000] [--slow-seconds 10] [--path /en/]
+
+For each server it starts `--workers` worker processes on a free port and
+opens `--clients` connections that send their request a header line at a
+time over `--slow-seconds` (a phone on a bad network). Meanwhile a fast
+client requests the page one request at a time. It prints the fast
+client's latency, how many slow clients were answered, and the resident
+memory of the server's processes.
+
+Needs `pip install gunicorn uvicorn` and a migrated database with content,
+the same one the site uses.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'wsgi': lambda port, workers: [
+        'gunicorn', 'fishtail.wsgi:application', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+    ],
+    'asgi': lambda port, workers: [
+        'uvicorn', 'fishtail.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--no-access-log',
+    ],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def rss_kib(pid):
+    """Resident memory of `pid` and its children, from /proc (Linux)."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as fh:
+                    ppid = int(fh.read().rsplit(')', 1)[1].split()[1])
+            except OSError:
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as fh:
+                total += next(int(line.split()[1]) for line in fh if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            pass
+    return total
+
+
+async def request(port, path, headers=(), delay=0.0, timeout=60.0):
+    """GET `path`, sending a header line every `delay` seconds; returns the status code."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+    try:
+        lines = [f'GET {path} HTTP/1.1', 'Host: localhost', *headers, 'Connection: close']
+        for line in lines:
+            writer.write(f'{line}\r\n'.encode())
+            await writer.drain()
+            if delay:
+                await asyncio.sleep(delay)
+        writer.write(b'\r\n')
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+        return int(response.split(b' ', 2)[1]) if response else 0
+    finally:
+        writer.close()
+
+
+async def wait_until_up(port, path, seconds=30):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if await request(port, path, timeout=5) == 200:
+                return True
+        except (OSError, asyncio.TimeoutError):
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def load(port, args, server):
+    # Filler headers so a slow client takes --slow-seconds to send its request.
+    filler = [f'X-Filler-{i}: {"x" * 20}' for i in range(20)]
+    delay = args.slow_seconds / len(filler)
+
+    async def slow_client():
+        try:
+            return await request(port, args.path, filler, delay, timeout=args.slow_seconds + 60)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            return 0
+
+    slow = [asyncio.create_task(slow_client()) for _ in range(args.clients)]
+    await asyncio.sleep(min(1.0, args.slow_seconds / 4))
+
+    latencies, failures = [], 0
+    deadline = time.monotonic() + args.slow_seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            status = await request(port, args.path, timeout=args.slow_seconds)
+        except (OSError, asyncio.TimeoutError):
+            status = 0
+        if status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            failures += 1
+    memory = rss_kib(server.pid)
+    answered = sum(status == 200 for status in await asyncio.gather(*slow))
+    return latencies, failures, answered, memory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--slow-seconds', type=float, default=10)
+    parser.add_argument('--path', default='/en/')
+    args = parser.parse_args()
+
+    # One file descriptor per slow client, on both ends.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    for name in args.servers:
+        port = free_port()
+        command = SERVERS[name](port, args.workers)
+        if shutil.which(command[0]) is None:
+            print(f"{name}: {command[0]} is not installed")
+            continue
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not asyncio.run(wait_until_up(port, args.path)):
+                print(f"{name}: the server did not answer {args.path}")
+                continue
+            idle = rss_kib(server.pid)
+            latencies, failures, answered, memory = asyncio.run(load(port, args, server))
+        finally:
+            server.terminate()
+            server.wait()
+        if latencies:
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+            timing = (f"median {statistics.median(latencies):.0f} ms, p95 {p95:.0f} ms, "
+                      f"max {latencies[-1]:.0f} ms over {len(latencies)} requests")
+        else:
+            timing = "no request answered"
+        print(f"{name} ({args.workers} workers): fast client {timing}, {failures} failed; "
+              f"{answered}/{args.clients} slow clients answered; "
+              f"memory {idle / 1024:.0f} MiB idle, {memory / 1024:.0f} MiB under load")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Response time of every public page with cold and warm compiled templates.
+
+Usage: python benchmarks/bench_templates.py [--rounds 20] [--language en]
+
+Cold is the first request a fresh worker serves: the cached template loader
+is emptied before each request. Warm is the same request once the templates
+are compiled (what WARM_TEMPLATES gives every request). The page and
+fragment caches are cleared before every request either way, so both
+columns include the view, the queries and the full render.
+
+Uses the database from the settings; the detail pages are skipped when
+there is no News, Job or Hostel row to show.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import translation  # noqa: E402
+
+from core import models  # noqa: E402
+from core.warmup import reset_templates, warm_templates  # noqa: E402
+
+
+def page_urls():
+    urls = {name: reverse(name) for name in (
+        'home', 'about', 'services', 'news', 'contact', 'team', 'career', 'hostel', 'faq', 'terms',
+    )}
+    urls['search'] = reverse('search') + '?q=hostel'
+    for name, model in (('news_detail', models.News), ('career', models.Job), ('hostel_booking', models.Hostel)):
+        obj = model.objects.order_by('pk').first()
+        if obj is not None:
+            label = 'career_detail' if name == 'career' else name
+            urls[label] = reverse(name, args=[obj.unique_id])
+    return urls
+
+
+def timed_get(client, url, cold):
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    if cold:
+        reset_templates()
+    start = time.perf_counter()
+    response = client.get(url)
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        raise SystemExit(f"{url} returned {response.status_code}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--language', default='en', choices=[code for code, _ in settings.LANGUAGES])
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    client = Client()
+    with translation.override(args.language):
+        urls = page_urls()
+
+    reset_templates()
+    timings = warm_templates()
+    print(f"Compiling all {len(timings)} templates: {sum(timings.values()) * 1000:.1f} ms")
+    print(f"{'page':<16} {'cold ms':>9} {'warm ms':>9} {'parse ms':>9}")
+    for label, url in urls.items():
+        client.get(url)  # imports, URL resolution and connection set-up are not what is measured
+        cold = statistics.median(timed_get(client, url, cold=True) for _ in range(args.rounds))
+        warm = statistics.median(timed_get(client, url, cold=False) for _ in range(args.rounds))
+        print(f"{label:<16} {cold * 1000:9.2f} {warm * 1000:9.2f} {(cold - warm) * 1000:9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Render time of a 100-item news page with the old and new translation lookups.
+
+Usage: python benchmarks/bench_translations.py [--items 100] [--rounds 50]
+
+No database is needed; the page is rendered from unsaved News objects.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.template.loader import render_to_string  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.utils import translation  # noqa: E402
+
+from core import models  # noqa: E402
+
+
+def legacy_get_translated_field(self, field_base_name):
+    """The per-call lookup BaseModel used before the resolution table."""
+    lang = translation.get_language()
+    field_name = f"{field_base_name}_{lang}"
+    if hasattr(self, field_name):
+        value = getattr(self, field_name)
+        if value:
+            return value
+    field_name_en = f"{field_base_name}_en"
+    if hasattr(self, field_name_en):
+        value = getattr(self, field_name_en)
+        if value:
+            return value
+    field_name_ja = f"{field_base_name}_ja"
+    if hasattr(self, field_name_ja):
+        return getattr(self, field_name_ja)
+    return None
+
+
+def make_news(count):
+    return [
+        models.News(
+            id=i,
+            unique_id=f'N{i:05d}',
+            header_ja=f'ニュース {i}',
+            content_ja='<p>本文</p>' * 50,
+            content_ne='<p>सामग्री</p>' * 50,
+        )
+        for i in range(count)
+    ]
+
+
+def render_page(request, news):
+    context = {'top_news': news[0], 'latest_news': news[1:], 'trending_news': news[:5]}
+    return render_to_string('core/news.html', context, request=request)
+
+
+def lookups(news):
+    # What news.html asks for per item: header (x2 on cards) and content.
+    for item in news:
+        item.get_translated_header()
+        item.get_translated_header()
+        item.get_translated_content()
+
+
+def bench(label, items, rounds, lang):
+    request = RequestFactory().get(f'/{lang}/news/')
+    with translation.override(lang):
+        # Fresh instances per round so the per-instance memo starts cold.
+        it = iter([make_news(items) for _ in range(rounds)])
+        page = timeit.timeit(lambda: render_page(request, next(it)), number=rounds)
+        it = iter([make_news(items) for _ in range(rounds)])
+        lookup = timeit.timeit(lambda: lookups(next(it)), number=rounds)
+    print(
+        f'{label:<8} {lang}: render {page / rounds * 1000:8.2f} ms/page, '
+        f'lookups {lookup / rounds * 1000:6.3f} ms/page'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    current = models.BaseModel.get_translated_field
+    # Load and parse the templates once so neither side pays for it.
+    render_page(RequestFactory().get('/en/news/'), make_news(2))
+    for lang in ('en', 'ne'):
+        models.BaseModel.get_translated_field = legacy_get_translated_field
+        bench('before', args.items, args.rounds, lang)
+        models.BaseModel.get_translated_field = current
+        bench('after', args.items, args.rounds, lang)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""The one-shot process_renditions run ends and leaves nothing pending.
+
+Usage: python benchmarks/check_renditions.py [--timeout 60]
+
+Runs against a throw-away test database of the configured engine and a
+temporary MEDIA_ROOT. Creates rows with a readable image, an unreadable
+one, an empty one and no image at all (NULL), then runs
+`manage.py process_renditions` without --loop. It must return within
+--timeout seconds, leave no row pending, and a second run must not touch
+any row (updated_at unchanged).
+Exits with status 1 when it does not.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.files.base import ContentFile  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from core import images, models  # noqa: E402
+
+
+def jpeg(width=800, height=600):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'JPEG')
+    return ContentFile(buffer.getvalue(), name='photo.jpg')
+
+
+def run_command(timeout):
+    """Run the one-shot command in a thread; False if it is still running after `timeout`."""
+    errors = []
+
+    def target():
+        try:
+            with open(os.devnull, 'w') as devnull:
+                call_command('process_renditions', stdout=devnull)
+        except Exception as exc:  # noqa: BLE001 - reported below
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if errors:
+        raise errors[0]
+    return not thread.is_alive()
+
+
+def stamps():
+    return {
+        (model.__name__, pk): updated_at
+        for model in images.RENDITION_MODELS
+        for pk, updated_at in model.objects.values_list('pk', 'updated_at')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    settings.MEDIA_ROOT = tempfile.mkdtemp()
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'renditions.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    ok = True
+    try:
+        user = get_user_model().objects.create(username='renditions')
+        models.News.objects.create(user=user, header_ja='Photo', content_ja='-', image=jpeg())
+        models.News.objects.create(user=user, header_ja='Broken', content_ja='-',
+                                   image=ContentFile(b'not an image', name='broken.jpg'))
+        models.News.objects.create(user=user, header_ja='Empty', content_ja='-', image='')
+        models.News.objects.create(user=user, header_ja='None', content_ja='-')
+        models.TeamMember.objects.create(user=user, name_en='None', name_ja='-', position_en='-', position_ja='-')
+        # Saving stores '' for no file; NULL comes from rows written around the ORM (old data, imports).
+        models.News.objects.filter(header_ja='None').update(image=None)
+        models.TeamMember.objects.update(image=None)
+
+        for attempt in ('first', 'second'):
+            before = stamps()
+            if not run_command(args.timeout):
+                print(f"{attempt} run: still running after {args.timeout:g}s")
+                ok = False
+                break
+            left = {model.__name__: pending for model in images.RENDITION_MODELS
+                    if (pending := images.pending(model).count())}
+            if left:
+                print(f"{attempt} run: rows still pending: {left}")
+                ok = False
+            if attempt == 'second':
+                touched = sorted(key for key, stamp in stamps().items() if before[key] != stamp)
+                if touched:
+                    print(f"second run: touched {touched}")
+                    ok = False
+        photo = models.News.objects.get(header_ja='Photo').image_renditions
+        if not photo.get('formats', {}).get('webp'):
+            print(f"no WebP renditions for a readable image: {photo}")
+            ok = False
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    print("OK" if ok else "FAILED")
+    # A hung command thread would keep the interpreter alive.
+    os._exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Read throughput of several worker processes on SQLite while bookings are written.
+
+Usage: python benchmarks/load_sqlite.py [--readers 1 2 4] [--writers 2] [--seconds 5] [--legacy]
+
+Like gunicorn workers, every reader and writer is its own process with its
+own connection to one throw-away database file. Readers run the queries of
+the news and hostel pages; writers book beds through intake.enqueue_booking
+and move bookings with reservations.set_status. For each number of readers
+it prints the reads and writes per second and the "database is locked"
+errors. --legacy runs the same load with SQLite's defaults (rollback
+journal, deferred transactions) for comparison.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import OperationalError, connection, connections  # noqa: E402
+
+from core import intake, models, reservations  # noqa: E402
+
+BOOKING = {
+    'customer_name': 'Load Test',
+    'phone_number': '000-0000-0000',
+    'current_address': 'Tokyo',
+    'email': 'load@example.com',
+}
+
+
+def reader(deadline, results):
+    reads = errors = 0
+    while time.time() < deadline:
+        try:
+            list(models.News.objects.exclude(unique_id='').order_by('-created_at', '-pk')[:10])
+            list(models.Hostel.objects.filter(is_active=True))
+            models.BookingRequest.objects.filter(status='pending').count()
+            reads += 1
+        except OperationalError:
+            errors += 1
+    connections.close_all()
+    results.put(('read', reads, errors))
+
+
+def writer(deadline, hostel_pk, seed, results):
+    rng = random.Random(seed)
+    hostel = models.Hostel.objects.get(pk=hostel_pk)
+    writes = errors = 0
+    while time.time() < deadline:
+        try:
+            if rng.random() < 0.5:
+                try:
+                    intake.enqueue_booking(hostel, BOOKING)
+                except reservations.NoBedsAvailable:
+                    pass
+            else:
+                booking = models.BookingRequest.objects.filter(hostel=hostel).order_by('?').first()
+                if booking is not None:
+                    try:
+                        reservations.set_status(booking, rng.choice(('pending', 'confirmed', 'cancelled')))
+                    except reservations.NoBedsAvailable:
+                        pass
+            writes += 1
+        except OperationalError:
+            errors += 1
+    connections.close_all()
+    results.put(('write', writes, errors))
+
+
+def run(readers, writers, seconds, hostel_pk):
+    connections.close_all()
+    results = multiprocessing.Queue()
+    deadline = time.time() + seconds
+    processes = [multiprocessing.Process(target=reader, args=(deadline, results)) for _ in range(readers)]
+    processes += [
+        multiprocessing.Process(target=writer, args=(deadline, hostel_pk, seed, results)) for seed in range(writers)
+    ]
+    for process in processes:
+        process.start()
+    totals = {'read': [0, 0], 'write': [0, 0]}
+    for _ in processes:
+        kind, done, errors = results.get()
+        totals[kind][0] += done
+        totals[kind][1] += errors
+    for process in processes:
+        process.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--readers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--legacy', action='store_true', help="SQLite's default journal and transactions.")
+    args = parser.parse_args()
+
+    if connection.vendor != 'sqlite':
+        sys.exit("This load test is for SQLite.")
+    # Workers fork with the parent's settings, like gunicorn --preload.
+    multiprocessing.set_start_method('fork')
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'load.sqlite3')
+    if args.legacy:
+        connection.settings_dict['OPTIONS'] = {}
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        if args.legacy:
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode=DELETE")
+        user = get_user_model().objects.create(username='load')
+        for i in range(50):
+            models.News.objects.create(user=user, header_ja=f'News {i}', content_ja='<p>-</p>', image='news/x.jpg')
+        hostel = models.Hostel.objects.create(
+            user=user, name_en='Load', address_en='-', features_en='-', price_per_month=0,
+            total_beds=1000, available_beds=1000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        print(f"journal_mode={journal_mode}, transaction_mode={connection.transaction_mode or 'DEFERRED'}, "
+              f"{args.writers} writer(s), {args.seconds:g}s per run")
+        for readers in args.readers:
+            totals = run(readers, args.writers, args.seconds, hostel.pk)
+            (reads, read_errors), (writes, write_errors) = totals['read'], totals['write']
+            print(f"{readers} reader(s): {reads / args.seconds:8.1f} reads/s  {writes / args.seconds:7.1f} writes/s  "
+                  f"locked: {read_errors} read, {write_errors} write")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Many threads booking, confirming and cancelling beds of one hostel at once.
+
+Usage: python benchmarks/stress_reservations.py [--threads 32] [--operations 50] [--beds 20]
+
+Runs against a throw-away test database of the configured engine, so
+point it at PostgreSQL the same way as the site:
+
+    DATABASE_ENGINE=django.db.backends.postgresql DATABASE_NAME=fishtail ... \\
+        python benchmarks/stress_reservations.py
+
+Each thread books through intake.enqueue_booking (what the booking form
+does) and moves random bookings between pending, confirmed and cancelled
+with reservations.set_status. At the end available_beds must equal
+total_beds minus the bookings holding a bed, and the daily booking stats
+must match the bookings by status.
+Exits with status 1 when it does not.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import OperationalError, connection, connections  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+
+from core import intake, models, reservations, stats  # noqa: E402
+
+BOOKING = {
+    'customer_name': 'Stress Test',
+    'phone_number': '000-0000-0000',
+    'current_address': 'Tokyo',
+    'email': 'stress@example.com',
+}
+
+
+def worker(hostel, operations, seed, counts):
+    rng = random.Random(seed)
+    try:
+        for _ in range(operations):
+            try:
+                if rng.random() < 0.6:
+                    try:
+                        intake.enqueue_booking(hostel, BOOKING)
+                        counts['booked'] += 1
+                    except reservations.NoBedsAvailable:
+                        counts['full'] += 1
+                    if rng.random() < 0.2:
+                        intake.process_batch()
+                else:
+                    booking = models.BookingRequest.objects.filter(hostel=hostel).order_by('?').first()
+                    if booking is None:
+                        continue
+                    try:
+                        reservations.set_status(booking, rng.choice(('pending', 'confirmed', 'cancelled')))
+                        counts['moved'] += 1
+                    except reservations.NoBedsAvailable:
+                        counts['full'] += 1
+            except OperationalError as exc:
+                # SQLite gives up on a write lock after its busy timeout.
+                counts[f'error: {exc}'] += 1
+    finally:
+        connections.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--operations', type=int, default=50, help="Operations per thread.")
+    parser.add_argument('--beds', type=int, default=20)
+    args = parser.parse_args()
+
+    # process_batch notifies staff of every booking.
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    if connection.vendor == 'sqlite':
+        # Threads cannot share the in-memory test database.
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'stress.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user = get_user_model().objects.create(username='stress')
+        hostel = models.Hostel.objects.create(
+            user=user, name_en='Stress', address_en='-', features_en='-', price_per_month=0,
+            total_beds=args.beds, available_beds=args.beds,
+        )
+        counts = Counter()
+        threads = [
+            threading.Thread(target=worker, args=(hostel, args.operations, seed, counts))
+            for seed in range(args.threads)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        while intake.process_batch():
+            pass
+
+        hostel.refresh_from_db()
+        holding = models.BookingRequest.objects.filter(hostel=hostel, holds_bed=True).count()
+        by_status = Counter(models.BookingRequest.objects.filter(hostel=hostel).values_list('status', flat=True))
+        inconsistent = models.BookingRequest.objects.filter(hostel=hostel).exclude(
+            holds_bed=True, status__in=reservations.HOLDING_STATUSES,
+        ).exclude(holds_bed=False, status='cancelled').count()
+        counted = models.HostelDailyStats.objects.filter(hostel=hostel).aggregate(
+            **{status: Sum(status) for status in stats.STATUSES}
+        )
+
+        print(f"{connection.vendor}: {args.threads} threads x {args.operations} operations in {elapsed:.2f}s")
+        for key, value in sorted(counts.items()):
+            print(f"  {key}: {value}")
+        print(f"  bookings by status: {dict(by_status)}, in the daily stats: {counted}")
+        print(f"  total {hostel.total_beds}, available {hostel.available_beds}, holding {holding}, "
+              f"occupancy {hostel.get_occupancy_rate()}%")
+        stats_ok = all(counted[status] == by_status[status] for status in stats.STATUSES)
+        ok = hostel.available_beds == hostel.total_beds - holding and not inconsistent and stats_ok
+        print("OK" if ok else f"INCONSISTENT ({inconsistent} booking(s) with a wrong hold, stats {'ok' if stats_ok else 'off'})")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
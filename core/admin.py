@@ -1,7 +1,98 @@
-from django.contrib import admin
-from .models import News, Video, Job, TeamMember, CompanyInfo, Service, Hostel, BookingRequest, ContactMessage, FAQ, TermsAndConditions
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.db import transaction
+from django.template.response import TemplateResponse
 
-class BaseModelAdmin(admin.ModelAdmin):
+from . import reservations, stats
+from .models import News, Video, Job, TeamMember, CompanyInfo, Service, Hostel, BookingRequest, ContactMessage, FAQ, TermsAndConditions, HostelDailyStats
+from .pagination import EstimatedCountPaginator
+
+
+# Column types a changelist does not load unless list_display shows them.
+WIDE_COLUMN_TYPES = ('TextField', 'JSONField')
+
+
+class LeanChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        columns = self.model_admin.get_list_columns(request)
+        return queryset.only(*columns) if columns is not None else queryset
+
+
+class LeanModelAdmin(admin.ModelAdmin):
+    """Changelists that cost the same number of queries whatever the page holds.
+
+    Every foreign key in list_display is joined (select_related) and only the
+    columns the page shows are selected, so the rich-text bodies stay in the
+    database. list_display entries that are not model fields must name the
+    fields they read in `list_columns`; without it whole rows are loaded.
+    """
+    list_columns = None
+    paginator = EstimatedCountPaginator
+    # Skips the second COUNT(*) of the unfiltered table behind "N total".
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return LeanChangeList
+
+    def _get_list_editable_queryset(self, request, prefix):
+        # The rows a list_editable POST saves, as lean as the page that showed them.
+        queryset = super()._get_list_editable_queryset(request, prefix)
+        columns = self.get_list_columns(request)
+        return queryset.only(*columns) if columns is not None else queryset
+
+    def list_edited_fields(self, obj, form):
+        """update_fields for a list_editable row, which was loaded with only(); None for a full row."""
+        if not obj.get_deferred_fields():
+            return None
+        fields = list(form.changed_data)
+        if any(field.name == 'updated_at' for field in obj._meta.concrete_fields):
+            fields.append('updated_at')
+        return fields
+
+    def save_model(self, request, obj, form, change):
+        fields = self.list_edited_fields(obj, form) if change else None
+        if fields is None:
+            super().save_model(request, obj, form, change)
+        else:
+            # Saving the whole row would load every deferred column first.
+            obj.save(update_fields=fields)
+
+    def _list_fields(self, request):
+        opts = self.model._meta
+        for name in self.get_list_display(request):
+            try:
+                yield name, opts.get_field(name)
+            except FieldDoesNotExist:
+                yield name, None
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is True:
+            return True
+        related = [name for name, field in self._list_fields(request) if field is not None and field.many_to_one]
+        return list(dict.fromkeys([*(self.list_select_related or ()), *related]))
+
+    def get_list_columns(self, request):
+        """Fields the changelist reads, for QuerySet.only(); None for whole rows."""
+        columns = list(self.list_columns or ())
+        for name, field in self._list_fields(request):
+            if field is None:
+                if self.list_columns is None:
+                    return None
+                continue
+            columns.append(name)
+            if field.many_to_one:
+                # What str() of the related row may need, short of its text
+                # bodies (TextField, CKEditor5Field) and JSON blobs.
+                columns += [
+                    f"{name}__{related.name}" for related in field.related_model._meta.concrete_fields
+                    if related.get_internal_type() not in WIDE_COLUMN_TYPES
+                ]
+        return columns
+
+
+class BaseModelAdmin(LeanModelAdmin):
     list_display = ('unique_id','header_ja', 'header_en', 'created_at', 'user')
     search_fields = ('unique_id', 'header_en')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
@@ -34,7 +125,7 @@ class TeamMemberAdmin(BaseModelAdmin):
     list_editable = ('is_ceo',)
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(LeanModelAdmin):
     list_display = ('unique_id', 'title_en', 'icon', 'order', 'is_hostel_service', 'created_at')
     search_fields = ('unique_id', 'title_en', 'title_ja', 'title_ne', 'icon')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
@@ -61,7 +152,7 @@ class ServiceAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 @admin.register(CompanyInfo)
-class CompanyInfoAdmin(admin.ModelAdmin):
+class CompanyInfoAdmin(LeanModelAdmin):
     list_display = ('unique_id', 'name_en', 'establishment_date', 'representative_en', 'capital', 'office_tel', 'created_at')
     search_fields = ('unique_id', 'name_en', 'name_ja', 'name_ne')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
@@ -91,7 +182,7 @@ class CompanyInfoAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 @admin.register(Hostel)
-class HostelAdmin(admin.ModelAdmin):
+class HostelAdmin(LeanModelAdmin):
     list_display = ('unique_id', 'name_en', 'total_beds', 'available_beds', 'price_per_month', 'is_active', 'created_at')
     search_fields = ('unique_id', 'name_en', 'name_ja', 'name_ne', 'address_en', 'address_ja', 'address_ne')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
@@ -118,13 +209,28 @@ class HostelAdmin(admin.ModelAdmin):
     
     exclude = ('user',)
     
+    def get_readonly_fields(self, request, obj=None):
+        # Bookings move available_beds; changing total_beds shifts it along.
+        return (*self.readonly_fields, 'available_beds')
+
     def save_model(self, request, obj, form, change):
         if not change:
             obj.user = request.user
-        super().save_model(request, obj, form, change)
+            obj.available_beds = obj.total_beds
+            super().save_model(request, obj, form, change)
+            return
+        # Never write back the available_beds the form was loaded with.
+        fields = self.list_edited_fields(obj, form) or [
+            f.name for f in obj._meta.concrete_fields if not f.primary_key and f.name != 'available_beds'
+        ]
+        with transaction.atomic():
+            old_total = Hostel.objects.select_for_update().values_list('total_beds', flat=True).get(pk=obj.pk)
+            obj.save(update_fields=fields)
+            reservations.resize(obj.pk, old_total, obj.total_beds)
+        obj.refresh_from_db(fields=['available_beds', 'updated_at'])
 
 @admin.register(BookingRequest)
-class BookingRequestAdmin(admin.ModelAdmin):
+class BookingRequestAdmin(LeanModelAdmin):
     list_display = ('unique_id', 'customer_name', 'hostel', 'phone_number', 'email', 'status', 'created_at')
     search_fields = ('unique_id', 'customer_name', 'email', 'phone_number', 'hostel__name_en')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
@@ -140,8 +246,69 @@ class BookingRequestAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_readonly_fields(self, request, obj=None):
+        # A held bed belongs to the hostel: move a booking by cancelling it and booking again.
+        if obj is not None:
+            return (*self.readonly_fields, 'hostel')
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        status = obj.status
+        if change:
+            # The status goes through reservations.set_status, which moves the bed.
+            fields = [name for name in form.changed_data if name != 'status']
+            if fields:
+                obj.save(update_fields=[*fields, 'updated_at'])
+            if 'status' not in form.changed_data:
+                return
+        else:
+            obj.status = 'cancelled'
+            obj.save()
+        try:
+            reservations.set_status(obj, status)
+        except reservations.NoBedsAvailable:
+            obj.refresh_from_db(fields=['status', 'holds_bed'])
+            self.message_user(
+                request,
+                f"{obj.hostel} has no bed left; booking {obj.unique_id} stays {obj.get_status_display().lower()}.",
+                messages.ERROR,
+            )
+
+@admin.register(HostelDailyStats)
+class HostelDailyStatsAdmin(admin.ModelAdmin):
+    """Booking and occupancy dashboard, read from the HostelDailyStats counters only."""
+    dashboard_days = (7, 30, 90, 365)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        try:
+            days = int(request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        days = days if days in self.dashboard_days else 30
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Booking statistics',
+            'days': days,
+            'dashboard_days': self.dashboard_days,
+            'stats': stats.dashboard(days),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/core/hosteldailystats/dashboard.html', context)
+
 @admin.register(ContactMessage)
-class ContactMessageAdmin(admin.ModelAdmin):
+class ContactMessageAdmin(LeanModelAdmin):
     list_display = ('unique_id', 'name', 'email', 'phone', 'purpose', 'is_read', 'created_at')
     search_fields = ('unique_id', 'name', 'email', 'phone', 'purpose')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
@@ -158,7 +325,7 @@ class ContactMessageAdmin(admin.ModelAdmin):
     )
 
 @admin.register(FAQ)
-class FAQAdmin(admin.ModelAdmin):
+class FAQAdmin(LeanModelAdmin):
     list_display = ('unique_id', 'question_en', 'order', 'is_active', 'created_at')
     search_fields = ('unique_id', 'question_en', 'question_ja', 'question_ne')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
@@ -185,7 +352,7 @@ class FAQAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 @admin.register(TermsAndConditions)
-class TermsAndConditionsAdmin(admin.ModelAdmin):
+class TermsAndConditionsAdmin(LeanModelAdmin):
     list_display = ('unique_id', 'updated_at', 'created_at')
     readonly_fields = ('unique_id', 'created_at', 'updated_at')
     
@@ -0,0 +1,149 @@
+"""Self-hosted, purged Bootstrap and Bootstrap Icons.
+
+The build_vendor_assets command writes the files below into static/vendor/;
+the vendor_styles/vendor_scripts template tags use them once they exist and
+fall back to the jsdelivr CDN before the first build.
+
+Purging keeps a CSS rule only if every class in one of its selectors occurs
+somewhere in the templates (any word counts, so classes built in template
+tags or inline scripts survive), in SAFELIST, or, for icons, in the
+Service.icon column.
+"""
+import re
+
+VENDOR_DIR = 'vendor'
+BOOTSTRAP_VERSION = '5.3.0'
+ICONS_VERSION = '1.11.3'
+
+SOURCES = {
+    'bootstrap.min.css': f'https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/css/bootstrap.min.css',
+    'bootstrap.bundle.min.js': f'https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/js/bootstrap.bundle.min.js',
+    'bootstrap-icons.css': f'https://cdn.jsdelivr.net/npm/bootstrap-icons@{ICONS_VERSION}/font/bootstrap-icons.css',
+    'fonts/bootstrap-icons.woff2': f'https://cdn.jsdelivr.net/npm/bootstrap-icons@{ICONS_VERSION}/font/fonts/bootstrap-icons.woff2',
+    'fonts/bootstrap-icons.woff': f'https://cdn.jsdelivr.net/npm/bootstrap-icons@{ICONS_VERSION}/font/fonts/bootstrap-icons.woff',
+}
+
+# Classes only Bootstrap's JavaScript or Django's message tags add.
+SAFELIST = {
+    'show', 'showing', 'hiding', 'collapsing', 'collapsed', 'fade', 'active', 'disabled',
+    'modal-open', 'modal-backdrop', 'modal-static', 'offcanvas-backdrop', 'dropdown-menu-end',
+    'was-validated', 'is-valid', 'is-invalid',
+    'alert-debug', 'alert-info', 'alert-success', 'alert-warning', 'alert-error', 'alert-danger',
+    # CKEditor writes <figure class="table"> into the rich-text fields.
+    'table',
+}
+
+WORD_RE = re.compile(r'[A-Za-z0-9_-]+')
+CLASS_RE = re.compile(r'\.((?:[A-Za-z0-9_-]|\\.)+)')
+NOT_RE = re.compile(r':not\([^()]*\)')
+ICON_CONTENT_RE = re.compile(r'content:\s*"\\([0-9a-fA-F]+)"')
+
+# At-rules whose block holds more rules; every other block is kept whole.
+NESTING_AT_RULES = ('@media', '@supports', '@container', '@layer')
+
+
+def template_words(texts):
+    words = set()
+    for text in texts:
+        words.update(WORD_RE.findall(text))
+    return words
+
+
+def _skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def _find(css, start, chars):
+    """Index of the first of `chars` at or after `start`, outside strings and comments."""
+    i = start
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            i = _skip_string(css, i)
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end < 0 else end + 2
+        elif c in chars:
+            return i
+        else:
+            i += 1
+    return len(css)
+
+
+def _block_end(css, open_index):
+    """Index just after the '}' matching the '{' at `open_index`."""
+    depth = 0
+    i = open_index
+    while i < len(css):
+        i = _find(css, i, '{}')
+        if i >= len(css):
+            break
+        depth += 1 if css[i] == '{' else -1
+        i += 1
+        if depth == 0:
+            return i
+    return len(css)
+
+
+def _selector_used(selector, used):
+    # A class inside :not() is required to be absent, so it is no reason to drop the rule.
+    selector = NOT_RE.sub('', selector)
+    classes = [name.replace('\\', '') for name in CLASS_RE.findall(selector)]
+    return all(name in used for name in classes)
+
+
+def purge_css(css, used):
+    """`css` without the rules none of whose selectors can match `used` classes."""
+    # Licence comments (/*! ... */) go first; all other comments are dropped.
+    out = re.findall(r'/\*!.*?\*/', css, flags=re.S)
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    i = 0
+    while i < len(css):
+        brace = _find(css, i, '{;')
+        prelude = css[i:brace].strip()
+        if brace >= len(css):
+            break
+        if css[brace] == ';':
+            # @charset, @import, or a stray declaration: keep as is.
+            out.append(css[i:brace + 1].strip())
+            i = brace + 1
+            continue
+        end = _block_end(css, brace)
+        body = css[brace + 1:end - 1]
+        if prelude.startswith(NESTING_AT_RULES):
+            inner = purge_css(body, used)
+            if inner:
+                out.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            out.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [s for s in _split_selectors(prelude) if _selector_used(s, used)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{body}}}")
+        i = end
+    return ''.join(out)
+
+
+def _split_selectors(prelude):
+    selectors = []
+    depth = 0
+    start = 0
+    for index, c in enumerate(prelude):
+        if c in '([':
+            depth += 1
+        elif c in ')]':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            selectors.append(prelude[start:index].strip())
+            start = index + 1
+    selectors.append(prelude[start:].strip())
+    return [s for s in selectors if s]
+
+
+def icon_codepoints(icons_css):
+    """Code points of the glyphs a (purged) bootstrap-icons.css still references."""
+    return {int(code, 16) for code in ICON_CONTENT_RE.findall(icons_css)}
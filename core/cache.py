@@ -0,0 +1,219 @@
+import hashlib
+import re
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+
+# Which public pages (by URL name) have to be dropped when a model changes.
+PAGE_DEPENDENCIES = {
+    'News': ('home', 'news'),
+    'Service': ('services',),
+    'TeamMember': ('team',),
+    'CompanyInfo': ('about',),
+    'FAQ': ('faq',),
+    'Hostel': ('hostel',),
+    'TermsAndConditions': ('terms',),
+}
+
+# The rendered CSRF token is per visitor, so it is swapped for a marker before
+# the page is stored and filled in again for every visitor it is served to.
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_MARKER = b'__CSRF_TOKEN__'
+
+
+def _version_key(page):
+    return f'page-version:{page}'
+
+
+def _page_key(page, version, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'page:{page}:{version}:{get_language()}:{path}'
+
+
+def is_cacheable_request(request):
+    """Only GETs without pending flash messages share a page.
+
+    The public pages never see a session (core.middleware), so a logged-in
+    admin gets the same page as everyone else.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return CookieStorage.cookie_name not in request.COOKIES
+
+
+def invalidate_pages(*pages):
+    """Drop every cached variant (language, query string) of the given pages."""
+    for page in pages:
+        try:
+            cache.incr(_version_key(page))
+        except ValueError:
+            cache.set(_version_key(page), 1, None)
+
+
+def _state_key(model):
+    return f'model-state:{model.__name__}'
+
+
+def _changed_key(model):
+    return f'model-changed:{model.__name__}'
+
+
+def _state_changed(model):
+    # A delete can lower MAX(updated_at), so the time of the change counts too.
+    cache.set(_changed_key(model), timezone.now(), None)
+    cache.delete(_state_key(model))
+
+
+def invalidate_model(model, using=None):
+    """Drop the pages and validators of `model`, changed on database `using`."""
+    invalidate_pages(*PAGE_DEPENDENCIES.get(model.__name__, ()))
+    # Once the change is visible: before that model_state() would cache the old rows again.
+    transaction.on_commit(lambda: _state_changed(model), using=using)
+
+
+def model_state(model):
+    """(latest change, row count) of `model`, from the cache or one aggregate query."""
+    state = cache.get_many([_state_key(model), _changed_key(model)])
+    if _state_key(model) in state:
+        return state[_state_key(model)]
+    row = model.objects.aggregate(modified=Max('updated_at'), count=Count('pk'))
+    changes = [stamp for stamp in (row['modified'], state.get(_changed_key(model))) if stamp]
+    result = (max(changes) if changes else None, row['count'])
+    cache.set(_state_key(model), result, settings.PAGE_CACHE_TIMEOUT)
+    return result
+
+
+def page_validators(request, model_list):
+    """(ETag, Last-Modified timestamp) of a page that renders `model_list`.
+
+    Besides the rows, the ETag covers what else changes the HTML: the
+    language, the template fragment version (bumped on template deploys) and
+    the visitor's CSRF cookie, which the page's forms are tied to.
+    """
+    states = [model_state(model) for model in model_list]
+    signature = repr((
+        get_language(),
+        caches['template_fragments'].version,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        [(modified and modified.isoformat(), count) for modified, count in states],
+    ))
+    # Weak: every render masks the CSRF token differently.
+    etag = f'W/"{hashlib.md5(signature.encode()).hexdigest()}"'
+    stamps = [modified for modified, _ in states if modified]
+    return etag, (int(max(stamps).timestamp()) if stamps else None)
+
+
+def _conditional_response(request, model_list):
+    """(validators, a 304/412 response or None) for a cacheable request."""
+    etag, last_modified = page_validators(request, model_list)
+    return (etag, last_modified), get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def _add_validators(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        # Stored, but revalidated on every use instead of heuristically fresh.
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_page(*model_list):
+    """Answer If-None-Match / If-Modified-Since with a 304 before the view runs.
+
+    `model_list` are the models the page renders; their latest change is
+    kept in the cache and dropped by invalidate_model(), so a revalidation
+    costs a cache read, or one aggregate query per model after a change.
+    Like the page cache this is for anonymous visitors only. Works on sync
+    and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return await view_func(request, *args, **kwargs)
+                validators, response = await sync_to_async(_conditional_response)(request, model_list)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return _add_validators(response, *validators)
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return view_func(request, *args, **kwargs)
+                validators, response = _conditional_response(request, model_list)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                return _add_validators(response, *validators)
+        # export_static re-renders the page when one of these changes.
+        wrapper.page_models = model_list
+        return wrapper
+    return decorator
+
+
+def _cached_response(request, cached):
+    content, content_type = cached
+    if CSRF_MARKER in content:
+        content = content.replace(CSRF_MARKER, get_token(request).encode())
+    return HttpResponse(content, content_type=content_type)
+
+
+def _cache_entry(response):
+    """What to store of a rendered page, or None if it must not be shared."""
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        return CSRF_INPUT_RE.sub(rb'\1' + CSRF_MARKER + rb'\2', response.content), response['Content-Type']
+    return None
+
+
+def cache_public_page(page):
+    """Serve the rendered page from the cache, one entry per URL and language.
+
+    Works on sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return await view_func(request, *args, **kwargs)
+                version = await cache.aget_or_set(_version_key(page), 1, None)
+                key = _page_key(page, version, request)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    return _cached_response(request, cached)
+                response = await view_func(request, *args, **kwargs)
+                entry = _cache_entry(response)
+                if entry is not None:
+                    await cache.aset(key, entry, settings.PAGE_CACHE_TIMEOUT)
+                return response
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                if not is_cacheable_request(request):
+                    return view_func(request, *args, **kwargs)
+                version = cache.get_or_set(_version_key(page), 1, None)
+                key = _page_key(page, version, request)
+                cached = cache.get(key)
+                if cached is not None:
+                    return _cached_response(request, cached)
+                response = view_func(request, *args, **kwargs)
+                entry = _cache_entry(response)
+                if entry is not None:
+                    cache.set(key, entry, settings.PAGE_CACHE_TIMEOUT)
+                return response
+        return wrapper
+    return decorator
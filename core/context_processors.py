@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from . import site
+
+# URL names whose pages belong to another section of the navbar.
+NAV_SECTIONS = {
+    'hostel_booking': 'hostel',
+    'news_detail': 'news',
+}
+
+
+def navigation(request):
+    """The navbar section of the current page, from the resolved URL name.
+
+    Resolved once per request instead of a request.path substring test per
+    nav link; header.html also uses it as a fragment cache key.
+    """
+    match = getattr(request, 'resolver_match', None)
+    name = match.url_name if match else None
+    return {'active_nav': NAV_SECTIONS.get(name, name)}
+
+
+def fragment_cache(request):
+    return {'fragment_cache_timeout': settings.FRAGMENT_CACHE_TIMEOUT}
+
+
+def site_context(request):
+    """company_info and terms for every template, loaded only when one is used."""
+    return {
+        name: SimpleLazyObject(lambda name=name: site.get(name))
+        for name in site.SINGLETONS
+    }
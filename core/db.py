@@ -0,0 +1,32 @@
+"""Connection metrics of the configured databases, for this worker process.
+
+With DATABASE_POOL each worker has its own psycopg pool, so the numbers are
+per process: requests_num counts the checkouts, requests_wait_ms the time
+they spent waiting for a free connection (see psycopg_pool's get_stats()).
+"""
+import os
+
+from django.db import connections
+
+
+def connection_stats():
+    """{alias: settings and, when pooled, pool statistics} of every database."""
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        entry = {
+            'pid': os.getpid(),
+            'vendor': connection.vendor,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+        }
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            pool_stats = pool.get_stats()
+            checkouts = pool_stats.get('requests_num', 0)
+            entry['pool'] = {
+                **pool_stats,
+                'checkout_wait_ms_avg': round(pool_stats.get('requests_wait_ms', 0) / checkouts, 2) if checkouts else 0,
+            }
+        stats[alias] = entry
+    return stats
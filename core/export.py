@@ -0,0 +1,186 @@
+"""Static export of the public pages (the export_static command).
+
+Every page of core/urls.py is rendered through the full middleware stack,
+as an anonymous visitor, once per language:
+
+    en/index.html                  /en/
+    en/news/index.html             /en/news/
+    en/news/index-<cursor>.html    /en/news/?cursor=<cursor>
+    en/news/<unique_id>/index.html /en/news/<unique_id>/
+
+with .gz (and .br) siblings. The search page (it needs a query) is left to
+Django. The CSRF tokens are blanked: csrf.js fetches one from the csrf_token
+view when a form on an exported page is submitted.
+
+export-manifest.json records a signature per file: the state of the models
+the view declares with @conditional_page (or the row's updated_at for a
+detail page) and a digest of the templates, translations and static
+manifest. A re-export renders only the files whose signature changed and
+deletes the files of rows that are gone.
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.test import Client
+from django.urls import resolve, reverse
+from django.utils import translation
+
+from . import models
+from .cache import CSRF_INPUT_RE, model_state
+from .staticfiles import MIN_COMPRESS_SIZE, compress
+from .warmup import django_engine, template_names
+
+MANIFEST_NAME = 'export-manifest.json'
+
+# URL names of the pages without arguments; 'search' needs a query and stays dynamic.
+PAGES = ('home', 'about', 'services', 'news', 'contact', 'team', 'career', 'hostel', 'faq', 'terms')
+
+# List pages whose ?cursor= pages are followed from their pagination links.
+PAGINATED = ('news', 'career')
+
+# URL name -> (rows with a page of their own, whether the page shows only
+# that row). hostel_booking renders the whole hostel list on GET.
+DETAIL_PAGES = {
+    'news_detail': (lambda: models.News.objects.exclude(unique_id=''), True),
+    'career': (lambda: models.Job.objects.all(), True),
+    'hostel_booking': (lambda: models.Hostel.objects.filter(is_active=True), False),
+}
+
+CURSOR_RE = re.compile(rb'[?&]cursor=([A-Za-z0-9_-]+)')
+
+
+def site_digest():
+    """Digest of what every page depends on besides the rows."""
+    digest = hashlib.md5()
+    digest.update(str(caches['template_fragments'].version).encode())
+    for name in template_names():
+        template = django_engine().get_template(name)
+        digest.update(template.source.encode())
+    for locale_path in settings.LOCALE_PATHS:
+        for mo in sorted(Path(locale_path).rglob('*.mo')):
+            digest.update(mo.read_bytes())
+    manifest_name = getattr(staticfiles_storage, 'manifest_name', None)
+    if manifest_name and staticfiles_storage.exists(manifest_name):
+        with staticfiles_storage.open(manifest_name) as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def file_name(url):
+    """Export path of `url` (a path with an optional ?cursor= query)."""
+    parts = urlsplit(url)
+    directory = parts.path.strip('/')
+    cursor = CURSOR_RE.search(f'?{parts.query}'.encode())
+    name = f'index-{cursor.group(1).decode()}.html' if cursor else 'index.html'
+    return f'{directory}/{name}' if directory else name
+
+
+def _models_signature(url, base):
+    view = resolve(urlsplit(url).path).func
+    states = [model_state(model) for model in getattr(view, 'page_models', ())]
+    return hashlib.md5(repr((base, [(m and m.isoformat(), c) for m, c in states])).encode()).hexdigest()
+
+
+def targets(base):
+    """(url, signature) of every exported page, in the active language."""
+    for name in PAGES:
+        url = reverse(name)
+        yield url, _models_signature(url, base)
+    for name, (rows, own_row) in DETAIL_PAGES.items():
+        objects = list(rows().only('pk', 'unique_id', 'updated_at'))
+        for obj in objects:
+            url = reverse(name, args=[obj.unique_id])
+            if own_row:
+                yield url, hashlib.md5(f'{base}:{obj.updated_at.isoformat()}'.encode()).hexdigest()
+            else:
+                yield url, _models_signature(url, base)
+
+
+class Exporter:
+    def __init__(self, output, host='localhost', full=False, stdout=None):
+        self.output = Path(output)
+        self.full = full
+        self.stdout = stdout
+        self.client = Client(HTTP_HOST=host)
+        manifest = self.output / MANIFEST_NAME
+        self.previous = {} if full or not manifest.exists() else json.loads(manifest.read_text())
+        self.pages = {}
+        self.rendered = 0
+
+    def run(self):
+        """Export every language; returns (rendered, kept, deleted) file counts."""
+        base = site_digest()
+        for code, _ in settings.LANGUAGES:
+            with translation.override(code):
+                for url, signature in targets(base):
+                    self.export(url, signature)
+
+        deleted = 0
+        for name in set(self.previous) - set(self.pages):
+            for path in (self.output / name, *(self.output / f'{name}.{ext}' for ext in ('gz', 'br'))):
+                if path.exists():
+                    path.unlink()
+                    deleted += 1
+        (self.output / MANIFEST_NAME).write_text(json.dumps(self.pages, indent=1, sort_keys=True))
+        return self.rendered, len(self.pages) - self.rendered, deleted
+
+    def export(self, url, signature):
+        name = file_name(url)
+        if self.previous.get(name) == signature and (self.output / name).exists():
+            self.pages[name] = signature
+            if resolve(urlsplit(url).path).url_name in PAGINATED:
+                # Unchanged rows, unchanged cursors: keep the pages behind them too.
+                prefix = name[:-len('index.html')] + 'index-'
+                self.pages.update(
+                    (other, sig) for other, sig in self.previous.items() if other.startswith(prefix)
+                )
+            return
+
+        content = self.render(url)
+        self.write(name, content)
+        self.pages[name] = signature
+        if resolve(urlsplit(url).path).url_name in PAGINATED:
+            self.follow_cursors(url, content, signature)
+
+    def follow_cursors(self, url, content, signature):
+        path = urlsplit(url).path
+        seen = set()
+        queue = list(CURSOR_RE.findall(content))
+        while queue:
+            cursor = queue.pop()
+            if cursor in seen:
+                continue
+            seen.add(cursor)
+            page_url = f'{path}?cursor={cursor.decode()}'
+            page = self.render(page_url)
+            self.write(file_name(page_url), page)
+            self.pages[file_name(page_url)] = signature
+            queue.extend(CURSOR_RE.findall(page))
+
+    def render(self, url):
+        response = self.client.get(url, secure=settings.SECURE_SSL_REDIRECT)
+        if response.status_code != 200:
+            raise ValueError(f'{url} returned {response.status_code}')
+        self.rendered += 1
+        # The token belongs to this client's cookie; csrf.js fetches the visitor's own.
+        return CSRF_INPUT_RE.sub(rb'\1\2', response.content)
+
+    def write(self, name, content):
+        path = self.output / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        variants = compress(content) if len(content) >= MIN_COMPRESS_SIZE else {}
+        for ext in ('gz', 'br'):
+            variant = path.with_name(f'{path.name}.{ext}')
+            if ext in variants:
+                variant.write_bytes(variants[ext])
+            elif variant.exists():
+                variant.unlink()
+        if self.stdout is not None:
+            self.stdout.write(name)
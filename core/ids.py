@@ -0,0 +1,115 @@
+"""Allocation of the public 6-character `unique_id` values.
+
+The allocator is chosen with the UNIQUE_ID_ALLOCATOR setting. Neither
+allocator queries the table before a single insert: UniqueIdMixin.save()
+relies on the unique constraint and retries inside a savepoint instead.
+"""
+import random
+import string
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+ALPHABET = string.digits + string.ascii_uppercase
+ID_LENGTH = 6
+ID_SPACE = len(ALPHABET) ** ID_LENGTH
+
+# Stay below the host parameter limit of older SQLite builds.
+LOOKUP_CHUNK_SIZE = 900
+
+
+def generate_random_id():
+    """Generates a random 6-character alphanumeric string."""
+    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=ID_LENGTH))
+
+
+def encode_base36(value):
+    """Fixed-width base36 encoding of 0 <= value < 36**6."""
+    chars = []
+    for _ in range(ID_LENGTH):
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def exclude_taken(model, candidates):
+    """Drop the candidates some row of `model` already uses (one query per chunk)."""
+    candidates = list(candidates)
+    taken = set()
+    for start in range(0, len(candidates), LOOKUP_CHUNK_SIZE):
+        chunk = candidates[start:start + LOOKUP_CHUNK_SIZE]
+        taken.update(
+            model._default_manager.filter(unique_id__in=chunk).values_list('unique_id', flat=True)
+        )
+    return [candidate for candidate in candidates if candidate not in taken]
+
+
+class RandomIdAllocator:
+    """Random IDs; a rare collision is caught by the unique constraint."""
+
+    def allocate(self, model, count=1):
+        if count == 1:
+            return [generate_random_id()]
+        ids = []
+        while len(ids) < count:
+            seen = set(ids)
+            candidates = {generate_random_id() for _ in range(count - len(ids))} - seen
+            ids.extend(exclude_taken(model, candidates))
+        return ids
+
+
+class SequenceIdAllocator:
+    """Collision-free IDs from a per-model counter reserved in blocks.
+
+    Each process reserves `block_size` counter values with a single UPDATE of
+    its IdSequence row and hands them out from memory. Counter values are
+    scattered over the 36**6 space with an invertible affine map, so
+    consecutive IDs do not look sequential.
+    """
+    block_size = 100
+    # Odd and not a multiple of 3, hence coprime to 36**6 (about 0.618 * 36**6).
+    multiplier = 1_345_299_023
+    offset = 714_025_241
+
+    def __init__(self):
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, model, count):
+        from .models import IdSequence
+
+        with transaction.atomic():
+            sequence, _ = IdSequence.objects.select_for_update().get_or_create(
+                name=model._meta.label_lower
+            )
+            start = sequence.next_value
+            sequence.next_value = start + count
+            sequence.save(update_fields=['next_value'])
+        return start, start + count
+
+    def allocate(self, model, count=1):
+        label = model._meta.label_lower
+        with self._lock:
+            start, end = self._blocks.get(label, (0, 0))
+            if end - start < count:
+                start, end = self._reserve(model, max(count, self.block_size))
+            self._blocks[label] = (start + count, end)
+        ids = [
+            encode_base36((value * self.multiplier + self.offset) % ID_SPACE)
+            for value in range(start, start + count)
+        ]
+        if count == 1:
+            return ids
+        # Rows created before the switch to this allocator hold random IDs.
+        free = exclude_taken(model, ids)
+        if len(free) < count:
+            free += self.allocate(model, count - len(free))
+        return free
+
+
+@lru_cache(maxsize=None)
+def get_allocator():
+    return import_string(settings.UNIQUE_ID_ALLOCATOR)()
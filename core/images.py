@@ -0,0 +1,150 @@
+"""Resized WebP/AVIF renditions of uploaded images.
+
+Models that set `rendition_field` keep a JSON description of the renditions
+of that image in `image_renditions`:
+
+    {"source": "news_images/a.jpg", "width": 2400, "height": 1600,
+     "formats": {"webp": [[320, 213, "renditions/news_images/a/320w.webp"], ...]}}
+
+Saving a new image marks the description stale; the process_renditions
+command generates the files outside the request. Until then the
+responsive_image template tag falls back to the original upload.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from . import models
+from .cache import invalidate_model
+
+logger = logging.getLogger(__name__)
+
+RENDITION_MODELS = (models.News, models.TeamMember, models.Hostel)
+
+CONTENT_TYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+SAVE_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'avif': {'quality': 60},
+}
+
+
+def available_formats():
+    """The configured formats this Pillow build can write, best compression first."""
+    Image.init()
+    formats = []
+    for fmt in settings.IMAGE_RENDITION_FORMATS:
+        if fmt.upper() in Image.SAVE:
+            formats.append(fmt)
+        else:
+            logger.warning("Pillow cannot write %s; skipping those renditions", fmt)
+    return sorted(formats, key=lambda fmt: fmt != 'avif')
+
+
+def rendition_widths(width):
+    """Configured widths narrower than the original, plus the original when it is narrower than the largest."""
+    widths = [w for w in settings.IMAGE_RENDITION_WIDTHS if w < width]
+    if width <= max(settings.IMAGE_RENDITION_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def rendition_name(source, width, fmt):
+    return f"renditions/{os.path.splitext(source)[0]}/{width}w.{fmt}"
+
+
+def build_renditions(field_file, storage=default_storage):
+    """Write the renditions of `field_file` and return their description."""
+    with field_file.open('rb') as fh:
+        with Image.open(fh) as image:
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    width, height = image.size
+    description = {'source': field_file.name, 'width': width, 'height': height, 'formats': {}}
+    for fmt in available_formats():
+        renditions = []
+        for target in rendition_widths(width):
+            target_height = max(1, round(height * target / width))
+            resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, fmt.upper(), **SAVE_OPTIONS.get(fmt, {}))
+            name = rendition_name(field_file.name, target, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            renditions.append([target, target_height, storage.save(name, ContentFile(buffer.getvalue()))])
+        description['formats'][fmt] = renditions
+    return description
+
+
+def delete_renditions(description, keep=(), storage=default_storage):
+    for renditions in description.get('formats', {}).values():
+        for _, _, name in renditions:
+            if name not in keep:
+                storage.delete(name)
+
+
+def pending(model):
+    """Rows whose renditions are missing or out of date."""
+    return model.objects.filter(
+        Q(image_renditions__stale=True)
+        | (Q(image_renditions={}) & Q(image__isnull=False) & ~Q(image=''))
+    )
+
+
+def process_object(obj):
+    """Regenerate the renditions of one row; returns True if its image could be read."""
+    old = obj.image_renditions or {}
+    field_file = getattr(obj, obj.rendition_field)
+    ok = True
+    description = {}
+    if field_file:
+        try:
+            description = build_renditions(field_file)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            logger.exception("Cannot create renditions of %s", field_file.name)
+            # Recorded so the row leaves the queue; the original is served as is.
+            description = {'source': field_file.name, 'formats': {}}
+            ok = False
+    new_names = {name for renditions in description.get('formats', {}).values() for _, _, name in renditions}
+    # A filtered update: no save signals, and a newer upload is not overwritten.
+    if field_file:
+        same_image = Q(**{obj.rendition_field: field_file.name})
+    else:
+        same_image = Q(**{obj.rendition_field: ''}) | Q(**{f"{obj.rendition_field}__isnull": True})
+    # updated_at moves so the {% cache %} fragments keyed on it pick up the <picture>.
+    updated = type(obj).objects.filter(same_image, pk=obj.pk).update(
+        image_renditions=description, updated_at=timezone.now()
+    )
+    if updated:
+        delete_renditions(old, keep=new_names)
+    else:
+        delete_renditions(description)
+    return ok
+
+
+def process_pending(batch_size=20):
+    """Generate renditions for up to `batch_size` rows per model; returns the number processed."""
+    total = 0
+    for model in RENDITION_MODELS:
+        rows = list(pending(model).order_by('pk')[:batch_size])
+        for obj in rows:
+            process_object(obj)
+        if rows:
+            invalidate_model(model)
+        total += len(rows)
+    return total
+
+
+def srcset(description, fmt, storage=default_storage):
+    return ', '.join(
+        f"{storage.url(name)} {width}w" for width, _, name in description['formats'].get(fmt, ())
+    )
@@ -0,0 +1,134 @@
+"""Queue for contact and booking form posts.
+
+The views only validate the submission and append it to IntakeSubmission,
+a single INSERT. The process_intake command drains the queue in batches:
+one bulk_create per model and one SMTP connection for all staff
+notifications of the batch.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+
+from . import models, reservations, stats
+
+logger = logging.getLogger(__name__)
+
+CONTACT_FIELDS = ('name', 'email', 'phone', 'purpose', 'message')
+BOOKING_FIELDS = ('customer_name', 'phone_number', 'current_address', 'email', 'message')
+
+
+def enqueue_contact(data):
+    """Validate a contact form post and queue it. Raises ValidationError."""
+    contact = models.ContactMessage(**{field: data.get(field) for field in CONTACT_FIELDS})
+    contact.full_clean(exclude=['unique_id'])
+    payload = {field: getattr(contact, field) for field in CONTACT_FIELDS}
+    return models.IntakeSubmission.objects.create(kind=models.IntakeSubmission.CONTACT, payload=payload)
+
+
+def enqueue_booking(hostel, data, user=None):
+    """Validate a booking form post for `hostel`, hold a bed and queue it.
+
+    Raises ValidationError, or reservations.NoBedsAvailable when the hostel is full.
+    """
+    booking = models.BookingRequest(**{field: data.get(field) for field in BOOKING_FIELDS})
+    booking.full_clean(exclude=['unique_id', 'hostel', 'user'])
+    payload = {field: getattr(booking, field) for field in BOOKING_FIELDS}
+    payload['hostel_id'] = hostel.pk
+    payload['user_id'] = user.pk if user is not None else None
+    # The bed is held now, so the next visitor already sees it taken; the
+    # pending BookingRequest process_batch creates inherits the hold.
+    payload['holds_bed'] = True
+    with transaction.atomic():
+        if not reservations.hold_bed(hostel.pk):
+            raise reservations.NoBedsAvailable(hostel.pk)
+        return models.IntakeSubmission.objects.create(kind=models.IntakeSubmission.BOOKING, payload=payload)
+
+
+def process_batch(batch_size=100, connection=None):
+    """Turn up to `batch_size` queued submissions into records and notify staff.
+
+    Returns the number of submissions taken off the queue.
+    """
+    with transaction.atomic():
+        batch = list(
+            models.IntakeSubmission.objects.select_for_update(skip_locked=True).order_by('pk')[:batch_size]
+        )
+        if not batch:
+            return 0
+
+        contacts = [
+            models.ContactMessage(**submission.payload)
+            for submission in batch
+            if submission.kind == models.IntakeSubmission.CONTACT
+        ]
+        booking_payloads = [
+            submission.payload
+            for submission in batch
+            if submission.kind == models.IntakeSubmission.BOOKING
+        ]
+        hostels = models.Hostel.objects.only('name_en').in_bulk({payload['hostel_id'] for payload in booking_payloads})
+        user_ids = set(
+            get_user_model().objects.filter(
+                pk__in={payload['user_id'] for payload in booking_payloads if payload['user_id']}
+            ).values_list('pk', flat=True)
+        )
+        bookings = []
+        for payload in booking_payloads:
+            if payload['hostel_id'] not in hostels:
+                logger.warning("Dropping booking for deleted hostel %s", payload['hostel_id'])
+                continue
+            booking = models.BookingRequest(**payload)
+            if booking.user_id not in user_ids:
+                booking.user_id = None
+            booking.hostel = hostels[payload['hostel_id']]
+            bookings.append(booking)
+
+        models.ContactMessage.objects.bulk_create(contacts)
+        models.BookingRequest.objects.bulk_create(bookings)
+        stats.record_new(bookings)
+        models.IntakeSubmission.objects.filter(pk__in=[submission.pk for submission in batch]).delete()
+
+    notify_staff(contacts, bookings, connection=connection)
+    return len(batch)
+
+
+def notify_staff(contacts, bookings, connection=None):
+    """Send one notification per record to COMPANY_EMAIL over a single connection."""
+    messages = [
+        EmailMessage(
+            subject=f"[Fishtail] New contact message {contact.unique_id}: {contact.purpose}",
+            body=(
+                f"Name: {contact.name}\nEmail: {contact.email}\nPhone: {contact.phone}\n"
+                f"Purpose: {contact.purpose}\n\n{contact.message}"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[settings.COMPANY_EMAIL],
+            reply_to=[contact.email],
+        )
+        for contact in contacts
+    ]
+    messages += [
+        EmailMessage(
+            subject=f"[Fishtail] New booking request {booking.unique_id}: {booking.hostel.name_en}",
+            body=(
+                f"Hostel: {booking.hostel.name_en}\nName: {booking.customer_name}\n"
+                f"Email: {booking.email}\nPhone: {booking.phone_number}\n"
+                f"Current address: {booking.current_address}\n\n{booking.message or ''}"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[settings.COMPANY_EMAIL],
+            reply_to=[booking.email],
+        )
+        for booking in bookings
+    ]
+    if not messages:
+        return 0
+    # The records are already saved; a mail outage must not lose them.
+    try:
+        return (connection or get_connection()).send_messages(messages)
+    except Exception:
+        logger.exception("Could not send %d staff notification(s)", len(messages))
+        return 0
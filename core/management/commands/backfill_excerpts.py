@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core import models
+from core.cache import invalidate_model
+
+EXCERPT_MODELS = (models.News, models.Job, models.Hostel)
+
+
+class Command(BaseCommand):
+    help = "Recompute the plain-text list excerpts (excerpt_ja/en/ne) of existing rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in EXCERPT_MODELS:
+            fields = [f"excerpt_{code}" for code in models.LANGUAGE_CODES]
+            batch = []
+            total = 0
+            # bulk_update leaves updated_at alone: the content did not change.
+            for obj in model.objects.order_by('pk').iterator(chunk_size=batch_size):
+                obj.refresh_excerpts()
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, fields)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, fields)
+                total += len(batch)
+            invalidate_model(model)
+            self.stdout.write(f"{model.__name__}: {total} rows updated")
@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import urllib.request
+from io import BytesIO
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from core import assets, models
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    font_subset = None
+
+FONT_SRC_RE = re.compile(r'(@font-face\s*\{[^}]*?)src:[^;}]*')
+# Above-the-fold chrome shared by every page: its CSS is inlined, the rest loads async.
+CRITICAL_TEMPLATES = ('base.html', 'header.html')
+
+
+class Command(BaseCommand):
+    help = (
+        "Vendor Bootstrap and Bootstrap Icons into static/vendor/, purged to the classes "
+        "and icons the templates and Service.icon use, plus the inlined critical CSS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            help="Directory holding the unmodified upstream files (same layout as the CDN); "
+                 "downloaded from jsdelivr when omitted.",
+        )
+        parser.add_argument(
+            '--output', default=os.path.join(settings.BASE_DIR, 'static', assets.VENDOR_DIR),
+        )
+        parser.add_argument('--no-critical', action='store_true', help="Do not write critical.css.")
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        (output / 'fonts').mkdir(parents=True, exist_ok=True)
+        upstream = {name: self.fetch(name, options['source']) for name in assets.SOURCES}
+
+        templates = self.template_sources()
+        used = assets.template_words(templates.values()) | assets.SAFELIST | self.service_icons()
+
+        bootstrap_css = upstream['bootstrap.min.css'].decode()
+        purged = assets.purge_css(bootstrap_css, used)
+        self.write(output / 'bootstrap.min.css', purged.encode(), len(bootstrap_css))
+        self.write(output / 'bootstrap.bundle.min.js', upstream['bootstrap.bundle.min.js'])
+
+        if not options['no_critical']:
+            critical_words = assets.template_words(
+                source for name, source in templates.items() if name.endswith(CRITICAL_TEMPLATES)
+            )
+            critical = assets.purge_css(purged, critical_words | assets.SAFELIST)
+            self.write(output / 'critical.css', critical.encode(), len(bootstrap_css))
+        elif (output / 'critical.css').exists():
+            (output / 'critical.css').unlink()
+
+        icons_css = assets.purge_css(upstream['bootstrap-icons.css'].decode(), used)
+        codepoints = assets.icon_codepoints(icons_css)
+        font_name, font = self.subset_font(upstream, codepoints)
+        font_format = font_name.rsplit('.', 1)[1]
+        icons_css = FONT_SRC_RE.sub(
+            lambda match: f'{match.group(1)}src:url("./fonts/{font_name}") format("{font_format}")',
+            icons_css,
+            count=1,
+        )
+        self.write(output / 'bootstrap-icons.css', icons_css.encode(), len(upstream['bootstrap-icons.css']))
+        for stale in (output / 'fonts').glob('bootstrap-icons*'):
+            if stale.name != font_name:
+                stale.unlink()
+        self.write(output / 'fonts' / font_name, font, len(upstream[f'fonts/{font_name}']))
+
+        manifest = {
+            'bootstrap': assets.BOOTSTRAP_VERSION,
+            'bootstrap_icons': assets.ICONS_VERSION,
+            'icons': sorted(word[3:] for word in used if word.startswith('bi-')),
+        }
+        (output / 'assets.json').write_text(json.dumps(manifest, indent=1))
+
+    def fetch(self, name, source):
+        if source:
+            path = Path(source) / name
+            if not path.exists():
+                raise CommandError(f"{path} is missing")
+            return path.read_bytes()
+        try:
+            with urllib.request.urlopen(assets.SOURCES[name], timeout=30) as response:
+                return response.read()
+        except OSError as exc:
+            raise CommandError(f"Cannot download {assets.SOURCES[name]}: {exc}; use --source") from exc
+
+    def template_sources(self):
+        """Source of the project templates and the core app's, keyed by path.
+
+        The admin and CKEditor templates bring their own CSS, so they are not scanned.
+        """
+        directories = [*settings.TEMPLATES[0]['DIRS'], Path(apps.get_app_config('core').path, 'templates')]
+        return {
+            str(path): path.read_text(encoding='utf-8')
+            for directory in directories
+            for path in sorted(Path(directory).rglob('*.html'))
+        }
+
+    def service_icons(self):
+        try:
+            return set(models.Service.objects.values_list('icon', flat=True))
+        except DatabaseError:
+            self.stderr.write("Service table not readable; only template icons are kept.")
+            return set()
+
+    def subset_font(self, upstream, codepoints):
+        """(file name, bytes) of the icon font cut down to `codepoints`."""
+        if font_subset is None:
+            self.stderr.write("fontTools is not installed; shipping the full icon font.")
+            return 'bootstrap-icons.woff2', upstream['fonts/bootstrap-icons.woff2']
+        try:
+            import brotli  # noqa: F401  (fontTools needs it to write WOFF2)
+            flavor = 'woff2'
+        except ImportError:
+            flavor = 'woff'
+        options = font_subset.Options()
+        options.flavor = flavor
+        options.layout_features = []
+        options.name_IDs = []
+        # Read the zlib-compressed WOFF: decoding WOFF2 would need brotli too.
+        font = font_subset.load_font(BytesIO(upstream['fonts/bootstrap-icons.woff']), options)
+        subsetter = font_subset.Subsetter(options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        buffer = BytesIO()
+        font_subset.save_font(font, buffer, options)
+        return f'bootstrap-icons.{flavor}', buffer.getvalue()
+
+    def write(self, path, content, original_size=None):
+        path.write_bytes(content)
+        if original_size:
+            self.stdout.write(f"{path.name}: {original_size} -> {len(content)} bytes")
+        else:
+            self.stdout.write(f"{path.name}: {len(content)} bytes")
@@ -0,0 +1,35 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.export import Exporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render every public page in every language into a directory a web server can "
+        "serve directly. Re-runs only render the pages whose rows, templates or assets changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'export'))
+        parser.add_argument(
+            '--host',
+            help="Host name the pages are rendered for; defaults to the first concrete ALLOWED_HOSTS entry.",
+        )
+        parser.add_argument('--full', action='store_true', help="Render every page, ignoring the manifest.")
+
+    def handle(self, *args, **options):
+        host = options['host'] or next(
+            (host.lstrip('.') for host in settings.ALLOWED_HOSTS if host not in ('*', '.')), 'localhost'
+        )
+        exporter = Exporter(
+            options['output'], host=host, full=options['full'],
+            stdout=self.stdout if options['verbosity'] > 1 else None,
+        )
+        try:
+            rendered, kept, deleted = exporter.run()
+        except ValueError as exc:
+            raise CommandError(exc) from exc
+        self.stdout.write(f"Rendered {rendered} page(s), kept {kept}, deleted {deleted} file(s) in {options['output']}")
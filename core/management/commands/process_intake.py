@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import intake
+
+
+class Command(BaseCommand):
+    help = "Create the queued contact messages and booking requests and notify staff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep running and poll the queue every --interval seconds.",
+        )
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.drain(options['batch_size'])
+            if processed:
+                self.stdout.write(f"Processed {processed} submission(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        total = 0
+        while True:
+            # Each batch mails its notifications over a connection of its own,
+            # opened only when there is something to send: an idle --loop
+            # holds no SMTP connection the server could drop.
+            processed = intake.process_batch(batch_size)
+            total += processed
+            if processed < batch_size:
+                return total
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import images
+
+
+class Command(BaseCommand):
+    help = "Generate the resized WebP/AVIF renditions of new and replaced image uploads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Keep running and look for new uploads every --interval seconds.",
+        )
+        parser.add_argument('--interval', type=float, default=10.0)
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Regenerate the renditions of every image first (after changing the widths or formats).",
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            for model in images.RENDITION_MODELS:
+                rows = list(model.objects.exclude(image_renditions={}).only('image_renditions'))
+                for obj in rows:
+                    # Keeps the old file names so they are cleaned up afterwards.
+                    obj.image_renditions = {**obj.image_renditions, 'stale': True}
+                model.objects.bulk_update(rows, ['image_renditions'], batch_size=500)
+        while True:
+            total = 0
+            while True:
+                processed = images.process_pending(options['batch_size'])
+                total += processed
+                if not processed:
+                    break
+            if total:
+                self.stdout.write(f"Processed {total} image(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per hostel, per day booking counters of the admin dashboard from the "
+        "bookings (after upgrading, or to repair them) and record today's occupancy."
+    )
+
+    def handle(self, *args, **options):
+        counted = stats.rebuild()
+        self.stdout.write(f"Counted {counted} booking(s)")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Drop and rebuild the full-text search index from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        search.rebuild(batch_size=options['batch_size'], stdout=self.stdout)
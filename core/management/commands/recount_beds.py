@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core import reservations
+
+
+class Command(BaseCommand):
+    help = "Set every hostel's available_beds to total_beds minus the bookings holding a bed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--adopt', action='store_true',
+            help="First count every pending or confirmed booking as holding a bed "
+                 "(once, for bookings made before reservations were tracked).",
+        )
+
+    def handle(self, *args, **options):
+        changed = reservations.recount(adopt=options['adopt'])
+        for unique_id, (old, new) in changed.items():
+            self.stdout.write(f"{unique_id}: {old} -> {new} available")
+        self.stdout.write(f"Updated {len(changed)} hostel(s)")
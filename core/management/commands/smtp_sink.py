@@ -0,0 +1,74 @@
+import socketserver
+
+from django.core.management.base import BaseCommand
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Accepts any SMTP conversation and prints each message it receives."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 fishtail smtp sink")
+        envelope = {'from': None, 'to': []}
+        for raw in self.rfile:
+            command = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply("250 fishtail")
+            elif verb == 'MAIL':
+                envelope = {'from': command[10:].strip(), 'to': []}
+                self.reply("250 OK")
+            elif verb == 'RCPT':
+                envelope['to'].append(command[8:].strip())
+                self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data in self.rfile:
+                    if data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data.decode('utf-8', 'replace').rstrip('\r\n'))
+                self.server.deliver(envelope, "\n".join(lines))
+                self.reply("250 OK: queued")
+            elif verb == 'RSET':
+                envelope = {'from': None, 'to': []}
+                self.reply("250 OK")
+            elif verb == 'NOOP':
+                self.reply("250 OK")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local SMTP server that accepts every message and prints it. "
+        "Stand-in for the real mail server in development and tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--port', type=int, default=1025)
+
+    def handle(self, *args, **options):
+        command = self
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+            def deliver(self, envelope, message):
+                command.stdout.write(
+                    f"---------- from {envelope['from']} to {', '.join(envelope['to'])}\n{message}\n"
+                )
+
+        with Server((options['host'], options['port']), SMTPSinkHandler) as server:
+            self.stdout.write(f"SMTP sink listening on {options['host']}:{options['port']}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
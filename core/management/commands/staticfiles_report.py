@@ -0,0 +1,44 @@
+import json
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.staticfiles import OptimizedManifestStaticFilesStorage
+
+
+class Command(BaseCommand):
+    help = "Show the bytes saved per asset by the last collectstatic."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=0, help="Only the N assets with the largest savings.")
+
+    def handle(self, *args, **options):
+        name = OptimizedManifestStaticFilesStorage.report_name
+        if not staticfiles_storage.exists(name):
+            raise CommandError(f"No {name} in STATIC_ROOT; run collectstatic first.")
+        with staticfiles_storage.open(name) as fh:
+            report = json.load(fh)
+
+        def served(entry):
+            # The smallest variant a browser can get.
+            return min(entry['optimized'], entry.get('gz', entry['optimized']), entry.get('br', entry['optimized']))
+
+        rows = sorted(report.items(), key=lambda item: item[1]['original'] - served(item[1]), reverse=True)
+        if options['limit']:
+            rows = rows[:options['limit']]
+        width = max((len(asset) for asset, _ in rows), default=5)
+        self.stdout.write(f"{'asset':<{width}} {'original':>10} {'optimized':>10} {'gzip':>9} {'brotli':>9} {'saved':>7}")
+        total_original = total_served = 0
+        for asset, entry in rows:
+            total_original += entry['original']
+            total_served += served(entry)
+            saved = 1 - served(entry) / entry['original'] if entry['original'] else 0
+            self.stdout.write(
+                f"{asset:<{width}} {entry['original']:>10} {entry['optimized']:>10} "
+                f"{entry.get('gz', '-'):>9} {entry.get('br', '-'):>9} {saved:>7.1%}"
+            )
+        if total_original:
+            self.stdout.write(
+                f"Total: {total_original} -> {total_served} bytes "
+                f"({1 - total_served / total_original:.1%} saved)"
+            )
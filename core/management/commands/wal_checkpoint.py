@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import sqlite
+
+
+class Command(BaseCommand):
+    help = "Copy the SQLite write-ahead log back into the database file (run it periodically, e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=sqlite.CHECKPOINT_MODES, default='TRUNCATE')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        try:
+            busy, frames, checkpointed = sqlite.checkpoint(options['mode'], options['database'])
+        except ValueError as exc:
+            raise CommandError(exc)
+        if frames == -1:
+            self.stdout.write("The database is not in WAL mode")
+            return
+        self.stdout.write(f"{checkpointed} of {frames} WAL frame(s) checkpointed")
+        if busy:
+            raise CommandError("The checkpoint could not finish while the database was busy; run it again")
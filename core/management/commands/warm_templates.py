@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+
+from core.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile every template under templates/ and core/templates/core/ into the cached "
+        "loader. Run in-process at start-up (WARM_TEMPLATES); from the shell it checks "
+        "that all templates compile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="Only these templates.")
+
+    def handle(self, *args, **options):
+        try:
+            timings = warm_templates(options['names'] or None)
+        except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+            raise CommandError(f"Template compilation failed: {exc}") from exc
+        if options['verbosity'] > 1:
+            for name, seconds in timings.items():
+                self.stdout.write(f"{name:<30} {seconds * 1000:7.2f} ms")
+        if options['verbosity']:
+            total = sum(timings.values())
+            self.stdout.write(f"Compiled {len(timings)} templates in {total * 1000:.1f} ms")
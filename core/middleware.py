@@ -0,0 +1,98 @@
+"""Sessions only where someone logs in, and replica reads for everyone else.
+
+The public pages show nothing per user, so outside settings.SESSION_PATHS
+(the admin and the CKEditor upload view) and the form posts of
+settings.SESSION_POST_PATHS (the booking form, which records the logged-in
+user) a request gets an empty session that is never loaded or saved: a
+sessionid cookie, valid or stale, costs no read there and no public page
+can create a session row. The language comes
+from the URL prefix and the django_language cookie (LocaleMiddleware), flash
+messages from a signed cookie (MESSAGE_STORAGE).
+
+replica_middleware lets the GET and HEAD requests of those public pages read
+from a replica (see core.routers).
+"""
+import functools
+import re
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.utils.decorators import sync_and_async_middleware
+
+from . import routers
+
+
+@functools.cache
+def _path_re(paths):
+    languages = '|'.join(re.escape(code) for code, _ in settings.LANGUAGES)
+    paths = '|'.join(re.escape(path) for path in paths) or '(?!)'
+    return re.compile(rf'^/(?:(?:{languages})/)?(?:{paths})')
+
+
+def is_public_path(path):
+    return not _path_re(tuple(settings.SESSION_PATHS)).match(path)
+
+
+def needs_session(request):
+    """Staff paths, and the form posts that record who is logged in (SESSION_POST_PATHS)."""
+    if not is_public_path(request.path_info):
+        return True
+    return request.method == 'POST' and bool(_path_re(tuple(settings.SESSION_POST_PATHS)).match(request.path_info))
+
+
+class NoSession(SessionBase):
+    """An always empty session that is never stored."""
+
+    def load(self):
+        return {}
+
+    def exists(self, session_key):
+        return False
+
+    def create(self):
+        pass
+
+    def save(self, must_create=False):
+        pass
+
+    def delete(self, session_key=None):
+        pass
+
+    @classmethod
+    def clear_expired(cls):
+        pass
+
+
+class StaffSessionMiddleware(SessionMiddleware):
+    def process_request(self, request):
+        if needs_session(request):
+            super().process_request(request)
+        else:
+            request.session = NoSession()
+
+    def process_response(self, request, response):
+        if isinstance(getattr(request, 'session', None), NoSession):
+            return response
+        return super().process_response(request, response)
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    def reads_from_replica(request):
+        return request.method in ('GET', 'HEAD') and is_public_path(request.path_info)
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not reads_from_replica(request):
+                return await get_response(request)
+            with routers.replica_reads():
+                return await get_response(request)
+    else:
+        def middleware(request):
+            if not reads_from_replica(request):
+                return get_response(request)
+            with routers.replica_reads():
+                return get_response(request)
+    return middleware
@@ -1,62 +1,263 @@
-import random
-import string
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.db.models.query import ModelIterable
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
 from django.conf import settings
 from django_ckeditor_5.fields import CKEditor5Field
 from django.utils.translation import get_language
 from django.core.exceptions import ValidationError
+from django.urls import reverse
+from .ids import get_allocator
+from .text import make_excerpt
 
+LANGUAGE_CODES = tuple(code for code, _ in settings.LANGUAGES)
 
-def generate_random_id():
-    """Generates a random 6-character alphanumeric string."""
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
 
-class BaseModel(models.Model):
+class UniqueIdMixin:
+    """Assigns `unique_id` on the first save without a pre-check query.
+
+    A collision fails the unique constraint inside a savepoint and the insert
+    is retried with a fresh ID from the configured allocator.
+    """
+    unique_id_attempts = 5
+
+    def save(self, *args, **kwargs):
+        if self.unique_id:
+            return super().save(*args, **kwargs)
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        allocator = get_allocator()
+        for attempt in range(self.unique_id_attempts):
+            self.unique_id = allocator.allocate(type(self))[0]
+            try:
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Only a taken ID is retried; the message wording depends on the backend.
+                collision = type(self)._default_manager.using(using).filter(unique_id=self.unique_id).exists()
+                self.unique_id = ''
+                if not collision or attempt == self.unique_id_attempts - 1:
+                    raise
+
+
+class UniqueIdQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Give every new object a unique_id up front, in one allocator call."""
+        objs = list(objs)
+        missing = [obj for obj in objs if not obj.unique_id]
+        if missing:
+            for obj, unique_id in zip(missing, get_allocator().allocate(self.model, len(missing))):
+                obj.unique_id = unique_id
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class TranslatedFieldsMixin:
+    """Resolves `<field>_<lang>` columns with the en -> ja fallback.
+
+    The attribute names to try are precomputed per language when the model
+    class is prepared (see `build_translation_table`), and resolved values are
+    memoized on the instance until it is saved or refreshed, or one of the
+    language columns is assigned.
+    """
+    _translation_table = {}
+    _translation_fallback = {}
+    _translated_attnames = frozenset()
+
+    def __setattr__(self, name, value):
+        if name in self._translated_attnames:
+            self.__dict__.pop('_translated_values', None)
+        super().__setattr__(name, value)
+
+    def get_translated_field(self, field_base_name):
+        lang = get_language()
+        memo = self.__dict__.get('_translated_values')
+        if memo is None:
+            memo = self.__dict__['_translated_values'] = {}
+        key = (lang, field_base_name)
+        if key in memo:
+            return memo[key]
+        value = None
+        chain = self._translation_table.get(lang, self._translation_fallback)
+        for attname in chain.get(field_base_name, ()):
+            value = getattr(self, attname)
+            if value:
+                break
+        memo[key] = value
+        return value
+
+    def clear_translation_cache(self):
+        self.__dict__.pop('_translated_values', None)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.clear_translation_cache()
+        super().refresh_from_db(*args, **kwargs)
+
+
+def build_translation_table(model):
+    """Map each language to the ordered attribute names to try per translated field."""
+    attnames = {field.attname for field in model._meta.concrete_fields}
+    bases = {
+        attname.rsplit('_', 1)[0]
+        for attname in attnames
+        if attname.rsplit('_', 1)[-1] in LANGUAGE_CODES
+    }
+
+    def chain(lang):
+        candidates = (f"{lang}", "en", "ja") if lang else ("en", "ja")
+        return {
+            base: tuple(f"{base}_{code}" for code in candidates if f"{base}_{code}" in attnames)
+            for base in bases
+        }
+
+    return {lang: chain(lang) for lang in LANGUAGE_CODES}, chain(None)
+
+
+@receiver(class_prepared)
+def attach_translation_table(sender, **kwargs):
+    if issubclass(sender, TranslatedFieldsMixin):
+        sender._translation_table, sender._translation_fallback = build_translation_table(sender)
+        sender._translated_attnames = frozenset(
+            attname
+            for table in sender._translation_table.values()
+            for chain in table.values()
+            for attname in chain
+        )
+
+
+class TranslatedModelIterable(ModelIterable):
+    """Seeds each instance's translation memo from the annotated columns."""
+
+    def __iter__(self):
+        lang, field_base_names = self.queryset._translations
+        for obj in super().__iter__():
+            memo = obj.__dict__.setdefault('_translated_values', {})
+            for base in field_base_names:
+                memo[lang, base] = getattr(obj, f"{base}_translated")
+            yield obj
+
+
+class TranslatedQuerySet(UniqueIdQuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._translations = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._translations = self._translations
+        return clone
+
+    def with_translations(self, *field_base_names):
+        """Resolve the given fields for the active language in the database.
+
+        Each field is annotated as `<field>_translated` with
+        COALESCE(NULLIF(field_<lang>, ''), NULLIF(field_en, ''), field_ja) and
+        every language column of it is deferred, so only the resolved value
+        is transferred. get_translated_<field>() then returns it directly.
+        """
+        lang = get_language()
+        table = self.model._translation_table.get(lang, self.model._translation_fallback)
+        annotations = {}
+        for base in field_base_names:
+            chain = table[base]
+            candidates = [NullIf(F(attname), Value('')) for attname in dict.fromkeys(chain[:-1])]
+            if candidates:
+                expression = Coalesce(*candidates, F(chain[-1]), output_field=TextField())
+            else:
+                expression = F(chain[-1])
+            annotations[f"{base}_translated"] = expression
+
+        if self._translations and self._translations[0] == lang:
+            field_base_names = self._translations[1] + field_base_names
+        clone = self.without_translations(*field_base_names).annotate(**annotations)
+        clone._translations = (lang, field_base_names)
+        clone._iterable_class = TranslatedModelIterable
+        return clone
+
+    def without_translations(self, *field_base_names):
+        """Defer every language column of the given fields."""
+        return self.defer(*(f"{base}_{code}" for base in field_base_names for code in LANGUAGE_CODES))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if self.model.excerpt_source:
+            for obj in objs:
+                obj.refresh_excerpts()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class BaseModel(UniqueIdMixin, TranslatedFieldsMixin, models.Model):
     unique_id = models.CharField(max_length=6, unique=True, blank=True, editable=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    objects = TranslatedQuerySet.as_manager()
+
+    # Rich-text field the list cards summarise; models that set it define
+    # excerpt_ja/en/ne, which are refreshed on every save.
+    excerpt_source = None
+    excerpt_length = 400
+
+    # ImageField the responsive_image tag serves renditions of; models that
+    # set it define image_renditions (see core.images).
+    rendition_field = None
+
     class Meta:
         abstract = True
 
+    def refresh_excerpts(self, codes=LANGUAGE_CODES):
+        for code in codes:
+            source = getattr(self, f"{self.excerpt_source}_{code}")
+            setattr(self, f"excerpt_{code}", make_excerpt(source, self.excerpt_length))
+
+    def mark_renditions_stale(self):
+        """Queue the image for process_renditions if it was replaced or cleared."""
+        image = getattr(self, self.rendition_field)
+        renditions = self.image_renditions
+        if renditions and not renditions.get('stale') and (
+            not image._committed or image.name != renditions.get('source')
+        ):
+            self.image_renditions = {**renditions, 'stale': True}
+
     def save(self, *args, **kwargs):
-        if not self.unique_id:
-            self.unique_id = generate_random_id()
-            # Ensure the generated ID is unique for the model.
-            ModelClass = self.__class__
-            while ModelClass.objects.filter(unique_id=self.unique_id).exists():
-                self.unique_id = generate_random_id()
+        update_fields = kwargs.get('update_fields')
+        # Only the sources this save writes: a row loaded with only() (the
+        # admin's list_editable) must not load its bodies or image to redo them.
+        deferred = self.get_deferred_fields()
+
+        def writes(name):
+            return name not in deferred and (update_fields is None or name in update_fields)
+
+        if self.excerpt_source:
+            codes = [code for code in LANGUAGE_CODES if writes(f"{self.excerpt_source}_{code}")]
+            self.refresh_excerpts(codes)
+            if update_fields is not None:
+                update_fields = {*update_fields, *(f"excerpt_{code}" for code in codes)}
+        if self.rendition_field and writes(self.rendition_field):
+            self.mark_renditions_stale()
+            if update_fields is not None:
+                update_fields = {*update_fields, 'image_renditions'}
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        self.clear_translation_cache()
         super().save(*args, **kwargs)
-    
-    def get_translated_field(self, field_base_name):
-        lang = get_language()
-        field_name = f"{field_base_name}_{lang}"
-        # Attempt to get the field in the current language
-        if hasattr(self, field_name):
-            value = getattr(self, field_name)
-            if value:
-                return value
-        # Fallback to English if available
-        field_name_en = f"{field_base_name}_en"
-        if hasattr(self, field_name_en):
-            value = getattr(self, field_name_en)
-            if value:
-                return value
-        # Fallback to Japanese as the default
-        field_name_ja = f"{field_base_name}_ja"
-        if hasattr(self, field_name_ja):
-            return getattr(self, field_name_ja)
-        return None
 
 class News(BaseModel):
     image = models.ImageField(upload_to='news_images/', blank=True, null=True)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     header_ja = models.CharField(max_length=255)
     header_en = models.CharField(max_length=255, blank=True, null=True)
     header_ne = models.CharField(max_length=255, blank=True, null=True)
     content_ja = CKEditor5Field()
     content_en = CKEditor5Field(blank=True, null=True)
     content_ne = CKEditor5Field(blank=True, null=True)
+    excerpt_ja = models.TextField(blank=True, default='', editable=False)
+    excerpt_en = models.TextField(blank=True, default='', editable=False)
+    excerpt_ne = models.TextField(blank=True, default='', editable=False)
+
+    excerpt_source = 'content'
+    rendition_field = 'image'
 
     def get_translated_header(self):
         return self.get_translated_field('header')
@@ -64,6 +265,12 @@ class News(BaseModel):
     def get_translated_content(self):
         return self.get_translated_field('content')
 
+    def get_translated_excerpt(self):
+        return self.get_translated_field('excerpt')
+
+    def get_absolute_url(self):
+        return reverse('news_detail', args=[self.unique_id])
+
     def __str__(self):
         return self.get_translated_header()
     
@@ -89,6 +296,11 @@ class Job(BaseModel):
     content_ja = CKEditor5Field()
     content_en = CKEditor5Field(blank=True, null=True)
     content_ne = CKEditor5Field(blank=True, null=True)
+    excerpt_ja = models.TextField(blank=True, default='', editable=False)
+    excerpt_en = models.TextField(blank=True, default='', editable=False)
+    excerpt_ne = models.TextField(blank=True, default='', editable=False)
+
+    excerpt_source = 'content'
 
     def get_translated_header(self):
         return self.get_translated_field('header')
@@ -99,6 +311,12 @@ class Job(BaseModel):
     def get_translated_content(self):
         return self.get_translated_field('content')
 
+    def get_translated_excerpt(self):
+        return self.get_translated_field('excerpt')
+
+    def get_absolute_url(self):
+        return reverse('career', args=[self.unique_id])
+
     def __str__(self):
         return self.get_translated_header()
 
@@ -112,6 +330,7 @@ class TeamMember(BaseModel):
     position_en = models.CharField(max_length=100)
     position_ne = models.CharField(max_length=100)
     image = models.ImageField(upload_to='team/', blank=True, null=True)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     twitter = models.URLField(blank=True, null=True)
     facebook = models.URLField(blank=True, null=True)
     instagram = models.URLField(blank=True, null=True)
@@ -120,6 +339,8 @@ class TeamMember(BaseModel):
     blog_ne = CKEditor5Field(blank=True, null=True)
     is_ceo = models.BooleanField(default=False, help_text="Mark this member as CEO")
 
+    rendition_field = 'image'
+
     def get_translated_name(self):
         return self.get_translated_field('name')
     
@@ -149,6 +370,9 @@ class Service(BaseModel):
     def get_translated_description(self):
         return self.get_translated_field('description')
 
+    def get_absolute_url(self):
+        return f"{reverse('services')}#service-{self.unique_id}"
+
     def __str__(self):
         return self.get_translated_title()
     
@@ -234,6 +458,7 @@ class CompanyInfo(BaseModel):
 
 class Hostel(BaseModel):
     image = models.ImageField(upload_to='hostel_images/')
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     name_en = models.CharField(max_length=255)
     name_ja = models.CharField(max_length=255, blank=True, null=True)
     name_ne = models.CharField(max_length=255, blank=True, null=True)
@@ -243,10 +468,16 @@ class Hostel(BaseModel):
     features_en = CKEditor5Field()
     features_ja = CKEditor5Field(blank=True, null=True)
     features_ne = CKEditor5Field(blank=True, null=True)
+    excerpt_ja = models.TextField(blank=True, default='', editable=False)
+    excerpt_en = models.TextField(blank=True, default='', editable=False)
+    excerpt_ne = models.TextField(blank=True, default='', editable=False)
     total_beds = models.PositiveIntegerField(default=0)
     available_beds = models.PositiveIntegerField(default=0)
     price_per_month = models.DecimalField(max_digits=10, decimal_places=2, help_text="Monthly rent in JPY")
-    is_active = models.BooleanField(default=True)
+    is_active = models.BooleanField(default=True, db_index=True)
+
+    excerpt_source = 'features'
+    rendition_field = 'image'
     
     def get_translated_name(self):
         return self.get_translated_field('name')
@@ -256,7 +487,13 @@ class Hostel(BaseModel):
     
     def get_translated_features(self):
         return self.get_translated_field('features')
+
+    def get_translated_excerpt(self):
+        return self.get_translated_field('excerpt')
     
+    def get_absolute_url(self):
+        return f"{reverse('hostel')}#hostel-{self.unique_id}"
+
     def get_occupancy_rate(self):
         """Calculate occupancy rate percentage"""
         if self.total_beds == 0:
@@ -270,9 +507,9 @@ class Hostel(BaseModel):
     class Meta:
         ordering = ['-created_at']
 
-class BookingRequest(models.Model):
+class BookingRequest(UniqueIdMixin, models.Model):
     unique_id = models.CharField(max_length=6, unique=True, blank=True, editable=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True)
     hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name='booking_requests')
@@ -288,17 +525,13 @@ class BookingRequest(models.Model):
             ('confirmed', 'Confirmed'),
             ('cancelled', 'Cancelled'),
         ],
-        default='pending'
+        default='pending',
+        db_index=True,
     )
+    # Whether this booking has one of the hostel's available_beds (see core.reservations).
+    holds_bed = models.BooleanField(default=False, editable=False)
     
-    def save(self, *args, **kwargs):
-        if not self.unique_id:
-            self.unique_id = generate_random_id()
-            # Ensure the generated ID is unique for the model.
-            ModelClass = self.__class__
-            while ModelClass.objects.filter(unique_id=self.unique_id).exists():
-                self.unique_id = generate_random_id()
-        super().save(*args, **kwargs)
+    objects = UniqueIdQuerySet.as_manager()
     
     def __str__(self):
         return f"Booking from {self.customer_name} - {self.hostel.get_translated_name()}"
@@ -306,24 +539,18 @@ class BookingRequest(models.Model):
     class Meta:
         ordering = ['-created_at']
 
-class ContactMessage(models.Model):
+class ContactMessage(UniqueIdMixin, models.Model):
     unique_id = models.CharField(max_length=6, unique=True, blank=True, editable=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     name = models.CharField(max_length=255)
     email = models.EmailField()
     phone = models.CharField(max_length=20)
     purpose = models.CharField(max_length=100)
     message = models.TextField()
-    is_read = models.BooleanField(default=False)
+    is_read = models.BooleanField(default=False, db_index=True)
     
-    def save(self, *args, **kwargs):
-        if not self.unique_id:
-            self.unique_id = generate_random_id()
-            ModelClass = self.__class__
-            while ModelClass.objects.filter(unique_id=self.unique_id).exists():
-                self.unique_id = generate_random_id()
-        super().save(*args, **kwargs)
+    objects = UniqueIdQuerySet.as_manager()
     
     def __str__(self):
         return f"Contact from {self.name} - {self.email}"
@@ -339,7 +566,7 @@ class FAQ(BaseModel):
     answer_ja = CKEditor5Field(blank=True, null=True)
     answer_ne = CKEditor5Field(blank=True, null=True)
     order = models.PositiveIntegerField(default=0, help_text="Display order (lower number appears first)")
-    is_active = models.BooleanField(default=True)
+    is_active = models.BooleanField(default=True, db_index=True)
     
     def get_translated_question(self):
         return self.get_translated_field('question')
@@ -347,6 +574,9 @@ class FAQ(BaseModel):
     def get_translated_answer(self):
         return self.get_translated_field('answer')
     
+    def get_absolute_url(self):
+        return f"{reverse('faq')}#faq-{self.unique_id}"
+
     def __str__(self):
         return self.get_translated_question()
     
@@ -355,7 +585,7 @@ class FAQ(BaseModel):
         verbose_name = 'FAQ'
         verbose_name_plural = 'FAQs'
 
-class TermsAndConditions(models.Model):
+class TermsAndConditions(TranslatedFieldsMixin, models.Model):
     """Single instance model for Terms & Conditions"""
     unique_id = models.CharField(max_length=6, unique=True, blank=True, editable=False, default='TC001')
     content_en = CKEditor5Field()
@@ -365,15 +595,7 @@ class TermsAndConditions(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     def get_translated_content(self):
-        lang = get_language()
-        field_name = f"content_{lang}"
-        if hasattr(self, field_name):
-            value = getattr(self, field_name)
-            if value:
-                return value
-        if self.content_en:
-            return self.content_en
-        return self.content_ja
+        return self.get_translated_field('content')
     
     def save(self, *args, **kwargs):
         if not self.unique_id:
@@ -382,6 +604,7 @@ class TermsAndConditions(models.Model):
         if not self.pk:
             if TermsAndConditions.objects.exists():
                 raise ValidationError("Only one instance of Terms and Conditions is allowed.")
+        self.clear_translation_cache()
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -390,3 +613,52 @@ class TermsAndConditions(models.Model):
     class Meta:
         verbose_name = 'Terms and Conditions'
         verbose_name_plural = 'Terms and Conditions'
+
+class IdSequence(models.Model):
+    """Next free counter value per model, used by core.ids.SequenceIdAllocator."""
+    name = models.CharField(max_length=100, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
+
+class IntakeSubmission(models.Model):
+    """A contact or booking form post waiting for the process_intake worker."""
+    CONTACT = 'contact'
+    BOOKING = 'booking'
+
+    kind = models.CharField(max_length=20, choices=[(CONTACT, 'Contact message'), (BOOKING, 'Booking request')])
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} queued at {self.created_at}"
+
+    class Meta:
+        ordering = ['pk']
+
+
+class HostelDailyStats(models.Model):
+    """Booking counters and occupancy of one hostel on one day, kept by core.stats.
+
+    pending/confirmed/cancelled count the bookings made that day by their
+    current status; total_beds/occupied_beds are the state after the last
+    bed that moved that day (null when none did).
+    """
+    hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    pending = models.IntegerField(default=0)
+    confirmed = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    total_beds = models.PositiveIntegerField(blank=True, null=True)
+    occupied_beds = models.PositiveIntegerField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.hostel_id} on {self.day}"
+
+    class Meta:
+        ordering = ['-day']
+        verbose_name = 'Booking statistics'
+        verbose_name_plural = 'Booking statistics'
+        constraints = [models.UniqueConstraint(fields=['hostel', 'day'], name='unique_hostel_daily_stats')]
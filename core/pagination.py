@@ -0,0 +1,173 @@
+"""Keyset (cursor) pagination on (created_at, id), newest first.
+
+Unlike Paginator there is no COUNT(*) and no OFFSET: a page is fetched with
+a WHERE on the key of the row it continues from, so every page costs the
+same as the first. Cursors are opaque URL-safe tokens.
+
+EstimatedCountPaginator is the admin's Paginator: for an unfiltered list of
+a large table it takes the row count from the planner's statistics instead
+of a COUNT(*).
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+def encode_cursor(direction, obj):
+    raw = f"{direction}|{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, created_at, pk), or None for a missing or bad token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        direction, created_at, pk = raw.split('|')
+        if direction not in ('next', 'prev'):
+            return None
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class KeysetPage:
+    """A page of objects with the cursors of its neighbours.
+
+    Offers the has_next/has_previous/has_other_pages API of Django's Page so
+    templates can test for pagination the same way.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, cursor=None, first_rows=None):
+        """Return the page after/before `cursor`, or the first page.
+
+        `first_rows` may hold the first per_page + 1 rows of the queryset when
+        the caller has already fetched them, which saves the query.
+        """
+        key = decode_cursor(cursor)
+        if key is None and first_rows is not None:
+            return self._rows_page(key, first_rows)
+        return self._rows_page(key, list(self._rows(key)))
+
+    async def aget_page(self, cursor=None, first_rows=None):
+        """get_page() for async views."""
+        key = decode_cursor(cursor)
+        if key is None and first_rows is not None:
+            return self._rows_page(key, first_rows)
+        return self._rows_page(key, [obj async for obj in self._rows(key)])
+
+    def _rows(self, key):
+        """The per_page + 1 rows from the key on, in the order they are read."""
+        if key is None:
+            return self.queryset.order_by('-created_at', '-pk')[:self.per_page + 1]
+        direction, created_at, pk = key
+        if direction == 'next':
+            return (
+                self.queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+                .order_by('-created_at', '-pk')[:self.per_page + 1]
+            )
+        return (
+            self.queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+            .order_by('created_at', 'pk')[:self.per_page + 1]
+        )
+
+    def _rows_page(self, key, rows):
+        if key is None:
+            return self._page(rows, has_more=len(rows) > self.per_page, has_before=False)
+        if key[0] == 'next':
+            return self._page(rows, has_more=len(rows) > self.per_page, has_before=True)
+        has_before = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        return self._page(rows, has_more=True, has_before=has_before)
+
+    def _page(self, rows, has_more, has_before):
+        rows = rows[:self.per_page]
+        if not rows:
+            return KeysetPage([])
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor('next', rows[-1]) if has_more else None,
+            previous_cursor=encode_cursor('prev', rows[0]) if has_before else None,
+        )
+
+
+def estimated_row_count(model, using='default'):
+    """The database's estimate of the rows in `model`'s table, or None without statistics.
+
+    PostgreSQL keeps it in pg_class.reltuples (refreshed by autovacuum),
+    SQLite in sqlite_stat1 once ANALYZE has run.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx IS NULL "
+                               "UNION ALL SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table, table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        # No sqlite_stat1 before the first ANALYZE.
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(float(str(row[0]).split()[0]))
+    # reltuples is -1 for a table that was never analyzed.
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the count of an unfiltered queryset over a large table.
+
+    Filtered querysets, and tables whose estimate is at most
+    `estimate_threshold` rows, are still counted exactly.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where and not queryset.query.is_sliced:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.estimate_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,124 @@
+"""Bed reservations: Hostel.available_beds follows the bookings.
+
+A booking that is pending or confirmed holds one bed of its hostel
+(BookingRequest.holds_bed); cancelling or deleting it gives the bed back.
+Every change is a conditional UPDATE with F() expressions, so the database
+decides the race instead of Python:
+
+- taking a bed only succeeds while available_beds > 0,
+- a booking's status and bed change together, compare-and-swap on its
+  previous status and holds_bed,
+
+which keeps `total_beds - available_beds` (what get_occupancy_rate shows)
+equal to the bookings holding a bed, on SQLite and PostgreSQL alike.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import models, stats
+from .cache import invalidate_model
+
+HOLDING_STATUSES = ('pending', 'confirmed')
+
+
+class NoBedsAvailable(Exception):
+    pass
+
+
+def _changed(hostel_id):
+    stats.snapshot_beds(hostel_id)
+    # The hostel cards are cached per updated_at, the pages per model.
+    transaction.on_commit(lambda: invalidate_model(models.Hostel))
+
+
+def hold_bed(hostel_id):
+    """Take one bed of the hostel; False when none is left."""
+    taken = models.Hostel.objects.filter(pk=hostel_id, available_beds__gt=0).update(
+        available_beds=F('available_beds') - 1, updated_at=timezone.now()
+    )
+    if taken:
+        _changed(hostel_id)
+    return bool(taken)
+
+
+def release_bed(hostel_id):
+    models.Hostel.objects.filter(pk=hostel_id, available_beds__lt=F('total_beds')).update(
+        available_beds=F('available_beds') + 1, updated_at=timezone.now()
+    )
+    _changed(hostel_id)
+
+
+def set_status(booking, status):
+    """Move `booking` to `status`, taking or giving back its bed.
+
+    Raises NoBedsAvailable, leaving the booking as it was, when the status
+    needs a bed and the hostel has none left.
+    """
+    hold = status in HOLDING_STATUSES
+    now = timezone.now()
+    with transaction.atomic():
+        while True:
+            current = (
+                models.BookingRequest.objects.select_for_update().filter(pk=booking.pk)
+                .values('status', 'holds_bed', 'hostel_id', 'created_at').get()
+            )
+            # Compare-and-swap: where select_for_update does not lock (SQLite),
+            # a writer in between makes this match nothing and we read again.
+            if models.BookingRequest.objects.filter(
+                pk=booking.pk, status=current['status'], holds_bed=current['holds_bed']
+            ).update(status=status, holds_bed=hold, updated_at=now):
+                break
+        if hold and not current['holds_bed']:
+            if not hold_bed(current['hostel_id']):
+                raise NoBedsAvailable(current['hostel_id'])
+        elif current['holds_bed'] and not hold:
+            release_bed(current['hostel_id'])
+        stats.record_status_change(current['hostel_id'], current['created_at'], current['status'], status)
+    booking.status = status
+    booking.holds_bed = hold
+    booking.updated_at = now
+
+
+def resize(hostel_id, old_total, new_total):
+    """Shift available_beds by a change of total_beds."""
+    delta = new_total - old_total
+    if delta:
+        models.Hostel.objects.filter(pk=hostel_id).update(
+            available_beds=Greatest(F('available_beds') + delta, 0), updated_at=timezone.now()
+        )
+        _changed(hostel_id)
+
+
+def recount(adopt=False):
+    """Set available_beds to total_beds minus the bookings holding a bed.
+
+    With `adopt`, every pending or confirmed booking is first marked as
+    holding one (for bookings made before reservations were tracked).
+    Returns {hostel unique_id: (old available, new available)} of the hostels that changed.
+    """
+    changed = {}
+    with transaction.atomic():
+        hostels = list(
+            models.Hostel.objects.select_for_update()
+            .only('unique_id', 'total_beds', 'available_beds').order_by('pk')
+        )
+        if adopt:
+            models.BookingRequest.objects.filter(status__in=HOLDING_STATUSES, holds_bed=False).update(
+                holds_bed=True
+            )
+        held = dict(
+            models.Hostel.objects.annotate(
+                held=Count('booking_requests', filter=Q(booking_requests__holds_bed=True))
+            ).values_list('pk', 'held')
+        )
+        for hostel in hostels:
+            available = max(0, hostel.total_beds - held.get(hostel.pk, 0))
+            if available != hostel.available_beds:
+                models.Hostel.objects.filter(pk=hostel.pk).update(
+                    available_beds=available, updated_at=timezone.now()
+                )
+                changed[hostel.unique_id] = (hostel.available_beds, available)
+                _changed(hostel.pk)
+    return changed
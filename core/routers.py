@@ -0,0 +1,123 @@
+"""Reads of the public pages from read replicas (settings.DATABASE_REPLICAS).
+
+replica_middleware marks the GET and HEAD requests of the public site; only
+their reads may go to a replica, one per request, picked round-robin or by
+the lowest latency of its last health check (REPLICA_SELECTION). Everything
+else reads from the primary:
+
+- the admin, form posts, management commands and workers;
+- the rest of a request once it has written anything;
+- every request for REPLICA_LAG_SECONDS after a write committed anywhere,
+  so a page cached right after a change is not rendered from a replica
+  that has not caught up yet;
+- all requests while no replica passes its health check (a SELECT 1, run at
+  most every REPLICA_CHECK_INTERVAL seconds per process).
+
+Writes always go to the primary.
+"""
+import contextvars
+import itertools
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+LAST_WRITE_KEY = 'db-last-write'
+
+# Per request: {'pinned': bool, 'alias': chosen replica, 'recent': bool}. A
+# mutable dict, so what the ORM notes in a sync_to_async thread is seen by
+# the whole request.
+_request = contextvars.ContextVar('replica_request', default=None)
+_health = {}
+_round_robin = itertools.count()
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+@contextmanager
+def replica_reads():
+    """Let the reads inside go to a replica, until something is written."""
+    token = _request.set({'pinned': False})
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def check(alias):
+    """Seconds a SELECT 1 on `alias` takes, or None when it fails."""
+    start = time.perf_counter()
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except DatabaseError:
+        connections[alias].close()
+        return None
+    return time.perf_counter() - start
+
+
+def healthy_replicas():
+    """[(alias, latency)] of the replicas that passed their last health check."""
+    now = time.monotonic()
+    healthy = []
+    for alias in replica_aliases():
+        checked = _health.get(alias)
+        if checked is None or now - checked[0] >= settings.REPLICA_CHECK_INTERVAL:
+            checked = _health[alias] = (now, check(alias))
+        if checked[1] is not None:
+            healthy.append((alias, checked[1]))
+    return healthy
+
+
+def choose_replica():
+    replicas = healthy_replicas()
+    if not replicas:
+        return DEFAULT_DB_ALIAS
+    if settings.REPLICA_SELECTION == 'least_latency':
+        return min(replicas, key=lambda replica: replica[1])[0]
+    return replicas[next(_round_robin) % len(replicas)][0]
+
+
+def _record_write():
+    cache.set(LAST_WRITE_KEY, time.time(), settings.REPLICA_LAG_SECONDS + 60)
+
+
+def _recently_written(state):
+    if 'recent' not in state:
+        last_write = cache.get(LAST_WRITE_KEY)
+        state['recent'] = last_write is not None and time.time() - last_write < settings.REPLICA_LAG_SECONDS
+    return state['recent']
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _request.get()
+        if state is None or state['pinned'] or _recently_written(state):
+            # Explicitly, or Django would follow an instance read from a replica.
+            return DEFAULT_DB_ALIAS
+        if 'alias' not in state:
+            state['alias'] = choose_replica()
+        return state['alias']
+
+    def db_for_write(self, model, **hints):
+        state = _request.get()
+        if state is None or not state['pinned']:
+            if state is not None:
+                state['pinned'] = True
+            transaction.on_commit(_record_write, using=DEFAULT_DB_ALIAS)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema from the primary.
+        return False if db in replica_aliases() else None
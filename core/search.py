@@ -0,0 +1,398 @@
+"""Full-text search over translated content.
+
+Every indexed object is stored once per language as a document with a
+title and a body. Text is tokenized here rather than by the database:
+words for Latin script, overlapping character bigrams for Japanese and
+Devanagari, which have no reliable word boundaries to split on. The
+backend stores and ranks the pre-tokenized text:
+
+- SQLite: an FTS5 table (bm25 ranking).
+- PostgreSQL: a tsvector column with a GIN index (ts_rank ranking).
+- Anything else: unranked icontains filters on the model fields.
+
+SEARCH_BACKEND overrides the choice ('sqlite', 'postgresql' or 'database').
+"""
+import logging
+import re
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language, gettext_lazy as _
+
+from . import models
+from .text import html_to_text, strip_markup
+
+logger = logging.getLogger(__name__)
+
+# model -> (title fields, body fields); each field exists as <field>_<lang>.
+SEARCH_FIELDS = {
+    models.News: (('header',), ('content',)),
+    models.Job: (('header',), ('attract_point', 'content')),
+    models.Service: (('title',), ('description',)),
+    models.FAQ: (('question',), ('answer',)),
+    models.Hostel: (('name',), ('address', 'features')),
+}
+
+# Labels of the result kinds on the /search/ page.
+SEARCH_LABELS = {
+    models.News: _('News'),
+    models.Job: _('Career'),
+    models.Service: _('Services'),
+    models.FAQ: _('FAQ'),
+    models.Hostel: _('Hostel'),
+}
+
+# Matches in the visitor's language rank this much higher.
+ACTIVE_LANGUAGE_BOOST = 1.5
+
+# Devanagari (minus the danda punctuation), kana, CJK ideographs, half-width kana.
+CJK_OR_DEVANAGARI = r'\u0900-\u0963\u0966-\u097f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f'
+TOKEN_RE = re.compile(rf'[{CJK_OR_DEVANAGARI}]+|[^\W_]+')
+NGRAM_RE = re.compile(rf'[{CJK_OR_DEVANAGARI}]')
+
+
+def tokenize(text):
+    """Lowercased words, with Japanese/Devanagari runs split into bigrams."""
+    tokens = []
+    for run in TOKEN_RE.findall(text.lower()):
+        if NGRAM_RE.match(run) and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def query_terms(query):
+    """Tokens of a user query as (token, is_prefix) pairs.
+
+    A single Japanese/Devanagari character cannot match a bigram exactly, so
+    it is searched as a prefix instead.
+    """
+    return [(token, len(token) == 1 and bool(NGRAM_RE.match(token))) for token in tokenize(query)]
+
+
+def kind_of(model):
+    return model._meta.label_lower
+
+
+def indexed_columns(model):
+    """The `<field>_<lang>` columns the documents of `model` are built from."""
+    title_fields, body_fields = SEARCH_FIELDS[model]
+    return {f"{field}_{lang}" for field in title_fields + body_fields for lang in models.LANGUAGE_CODES}
+
+
+def document_for(obj, lang, to_text=html_to_text):
+    """(title, body) plain text of `obj` in `lang`; either may be empty."""
+    title_fields, body_fields = SEARCH_FIELDS[type(obj)]
+    title = ' '.join(to_text(getattr(obj, f"{field}_{lang}")) for field in title_fields).strip()
+    body = ' '.join(to_text(getattr(obj, f"{field}_{lang}")) for field in body_fields).strip()
+    return title, body
+
+
+def documents_for(obj):
+    """(lang, title, body) plain-text documents of `obj`, one per filled-in language."""
+    documents = []
+    for lang in models.LANGUAGE_CODES:
+        title, body = document_for(obj, lang)
+        if title or body:
+            documents.append((lang, title, body))
+    return documents
+
+
+class SQLiteBackend:
+    document_table = 'core_search_document'
+    fts_table = 'core_search_fts'
+
+    def create_tables(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.document_table} ("
+            "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, object_id INTEGER NOT NULL, "
+            "lang TEXT NOT NULL, UNIQUE (kind, object_id, lang))"
+        )
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} "
+            "USING fts5(title, body, tokenize='ascii')"
+        )
+
+    def drop_tables(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.fts_table}")
+        cursor.execute(f"DROP TABLE IF EXISTS {self.document_table}")
+
+    def remove(self, cursor, kind, object_id):
+        cursor.execute(
+            f"DELETE FROM {self.fts_table} WHERE rowid IN "
+            f"(SELECT id FROM {self.document_table} WHERE kind = %s AND object_id = %s)",
+            [kind, object_id],
+        )
+        cursor.execute(
+            f"DELETE FROM {self.document_table} WHERE kind = %s AND object_id = %s", [kind, object_id]
+        )
+
+    def add(self, cursor, kind, object_id, documents):
+        for lang, title, body in documents:
+            cursor.execute(
+                f"INSERT INTO {self.document_table} (kind, object_id, lang) VALUES (%s, %s, %s)",
+                [kind, object_id, lang],
+            )
+            cursor.execute(
+                f"INSERT INTO {self.fts_table} (rowid, title, body) VALUES (%s, %s, %s)",
+                [cursor.lastrowid, ' '.join(tokenize(title)), ' '.join(tokenize(body))],
+            )
+
+    def search(self, cursor, terms, kinds, limit):
+        match = ' '.join(f'"{token}"*' if prefix else f'"{token}"' for token, prefix in terms)
+        placeholders = ', '.join(['%s'] * len(kinds))
+        # bm25() is lower for better matches; titles weigh ten times the body.
+        cursor.execute(
+            f"SELECT d.kind, d.object_id, d.lang, bm25({self.fts_table}, 10.0, 1.0) AS score "
+            f"FROM {self.fts_table} JOIN {self.document_table} d ON d.id = {self.fts_table}.rowid "
+            f"WHERE {self.fts_table} MATCH %s AND d.kind IN ({placeholders}) "
+            "ORDER BY score LIMIT %s",
+            [match, *kinds, limit],
+        )
+        return [(kind, object_id, lang, -score) for kind, object_id, lang, score in cursor.fetchall()]
+
+
+class PostgreSQLBackend:
+    document_table = 'core_search_document'
+
+    def create_tables(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.document_table} ("
+            "id bigserial PRIMARY KEY, kind varchar(100) NOT NULL, object_id bigint NOT NULL, "
+            "lang varchar(10) NOT NULL, document tsvector NOT NULL, UNIQUE (kind, object_id, lang))"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.document_table}_gin "
+            f"ON {self.document_table} USING GIN (document)"
+        )
+
+    def drop_tables(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.document_table}")
+
+    def remove(self, cursor, kind, object_id):
+        cursor.execute(
+            f"DELETE FROM {self.document_table} WHERE kind = %s AND object_id = %s", [kind, object_id]
+        )
+
+    def add(self, cursor, kind, object_id, documents):
+        for lang, title, body in documents:
+            cursor.execute(
+                f"INSERT INTO {self.document_table} (kind, object_id, lang, document) VALUES "
+                "(%s, %s, %s, setweight(to_tsvector('simple', %s), 'A') "
+                "|| setweight(to_tsvector('simple', %s), 'B'))",
+                [kind, object_id, lang, ' '.join(tokenize(title)), ' '.join(tokenize(body))],
+            )
+
+    def search(self, cursor, terms, kinds, limit):
+        tsquery = ' & '.join(f"'{token}':*" if prefix else f"'{token}'" for token, prefix in terms)
+        placeholders = ', '.join(['%s'] * len(kinds))
+        cursor.execute(
+            "SELECT kind, object_id, lang, ts_rank(document, query) AS score "
+            f"FROM {self.document_table}, to_tsquery('simple', %s) query "
+            f"WHERE document @@ query AND kind IN ({placeholders}) "
+            "ORDER BY score DESC LIMIT %s",
+            [tsquery, *kinds, limit],
+        )
+        return cursor.fetchall()
+
+
+class DatabaseBackend:
+    """No index: icontains on every language column, newest first."""
+
+    def create_tables(self, cursor):
+        pass
+
+    def drop_tables(self, cursor):
+        pass
+
+    def remove(self, cursor, kind, object_id):
+        pass
+
+    def add(self, cursor, kind, object_id, documents):
+        pass
+
+    def search(self, cursor, terms, kinds, limit):
+        query = ' '.join(token for token, _ in terms)
+        results = []
+        for model, (title_fields, body_fields) in SEARCH_FIELDS.items():
+            if kind_of(model) not in kinds:
+                continue
+            condition = Q()
+            for field in title_fields + body_fields:
+                for lang in models.LANGUAGE_CODES:
+                    condition |= Q(**{f"{field}_{lang}__icontains": query})
+            pks = model.objects.filter(condition).order_by('-created_at').values_list('pk', flat=True)[:limit]
+            results.extend((kind_of(model), pk, None, 0.0) for pk in pks)
+        return results[:limit]
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgreSQLBackend,
+    'database': DatabaseBackend,
+}
+
+_ready = set()
+_ready_lock = threading.Lock()
+
+
+def get_backend():
+    name = getattr(settings, 'SEARCH_BACKEND', None) or connection.vendor
+    return BACKENDS.get(name, DatabaseBackend)()
+
+
+def _ensure_tables(backend, cursor):
+    with _ready_lock:
+        if connection.alias not in _ready:
+            backend.create_tables(cursor)
+            _ready.add(connection.alias)
+
+
+def index_object(obj):
+    """(Re)index one object; called after its save is committed."""
+    backend = get_backend()
+    with transaction.atomic(), connection.cursor() as cursor:
+        _ensure_tables(backend, cursor)
+        backend.remove(cursor, kind_of(type(obj)), obj.pk)
+        backend.add(cursor, kind_of(type(obj)), obj.pk, documents_for(obj))
+
+
+def remove_object(model, pk):
+    backend = get_backend()
+    with transaction.atomic(), connection.cursor() as cursor:
+        _ensure_tables(backend, cursor)
+        backend.remove(cursor, kind_of(model), pk)
+
+
+def rebuild(batch_size=500, stdout=None):
+    """Drop the index and index every object of every searchable model."""
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.drop_tables(cursor)
+        backend.create_tables(cursor)
+    _ready.add(connection.alias)
+    for model in SEARCH_FIELDS:
+        count = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for obj in model.objects.order_by('pk').iterator(chunk_size=batch_size):
+                backend.add(cursor, kind_of(model), obj.pk, documents_for(obj))
+                count += 1
+        if stdout is not None:
+            stdout.write(f"{model.__name__}: {count} object(s) indexed")
+
+
+def search(query, searchable=None, limit=50):
+    """Ranked hits for `query` as a list of (model, pk, lang, score), best first.
+
+    Each object appears once, with the language of its best-matching
+    document; documents in the active language get ACTIVE_LANGUAGE_BOOST.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    kinds = {kind_of(model): model for model in (searchable or SEARCH_FIELDS)}
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        _ensure_tables(backend, cursor)
+        # Several language documents of one object can match; over-fetch a bit.
+        rows = backend.search(cursor, terms, list(kinds), limit * len(models.LANGUAGE_CODES))
+    active = get_language()
+    rows = sorted(
+        ((kind, object_id, lang, score * ACTIVE_LANGUAGE_BOOST if lang == active else score)
+         for kind, object_id, lang, score in rows),
+        key=lambda row: row[3],
+        reverse=True,
+    )
+    hits = []
+    seen = set()
+    for kind, object_id, lang, score in rows:
+        if (kind, object_id) in seen:
+            continue
+        seen.add((kind, object_id))
+        hits.append((kinds[kind], object_id, lang, score))
+    return hits[:limit]
+
+
+def search_objects(query, model, limit=50):
+    """Objects of `model` matching `query`, best match first."""
+    pks = [pk for _, pk, _, _ in search(query, [model], limit)]
+    objects = model.objects.in_bulk(pks)
+    return [objects[pk] for pk in pks if pk in objects]
+
+
+def highlight(text, query, width=200):
+    """Escaped excerpt of `text` around the first match, matches wrapped in <mark>."""
+    patterns = sorted({re.escape(token) for token, _ in query_terms(query)}, key=len, reverse=True)
+    if not text or not patterns:
+        return conditional_escape(text[:width])
+    term_re = re.compile('|'.join(patterns), re.IGNORECASE)
+    first = term_re.search(text)
+    start = max(0, first.start() - width // 3) if first and len(text) > width else 0
+    window = text[start:start + width]
+    parts = ['…'] if start else []
+    position = 0
+    for match in term_re.finditer(window):
+        parts.append(conditional_escape(window[position:match.start()]))
+        parts.append(f"<mark>{conditional_escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(conditional_escape(window[position:]))
+    if start + width < len(text):
+        parts.append('…')
+    return mark_safe(''.join(parts))
+
+
+def site_search(query, limit=20):
+    """Mixed results across every searchable model for the /search/ page.
+
+    Each result holds the object, its URL, and a title and highlighted
+    snippet taken from the active language when that text matches, else
+    from the language that did.
+    """
+    hits = search(query, limit=limit)
+    by_model = {}
+    for model, pk, _, _ in hits:
+        by_model.setdefault(model, []).append(pk)
+    objects = {model: _public(model).in_bulk(pks) for model, pks in by_model.items()}
+    tokens = [token for token, _ in query_terms(query)]
+    active = get_language()
+    results = []
+    for model, pk, lang, score in hits:
+        obj = objects[model].get(pk)
+        if obj is None:
+            continue
+        title, body = _display_document(obj, (active, lang, *models.LANGUAGE_CODES), tokens)
+        results.append({
+            'object': obj,
+            'kind': SEARCH_LABELS[model],
+            'title': highlight(title, query, width=len(title)),
+            'snippet': highlight(body, query),
+            'url': obj.get_absolute_url(),
+        })
+    return results
+
+
+def _public(model):
+    """Rows the public pages show; hidden FAQs and hostels stay indexed but unlisted."""
+    queryset = model.objects.all()
+    if any(field.name == 'is_active' for field in model._meta.fields):
+        queryset = queryset.filter(is_active=True)
+    return queryset
+
+
+def _display_document(obj, languages, tokens):
+    """The first of `languages` whose text contains a query token, else the first filled in."""
+    fallback = None
+    for lang in dict.fromkeys(code for code in languages if code):
+        title, body = document_for(obj, lang, to_text=strip_markup)
+        if not (title or body):
+            continue
+        text = f"{title} {body}".lower()
+        if any(token in text for token in tokens):
+            return title, body
+        fallback = fallback or (title, body)
+    return fallback or ('', '')
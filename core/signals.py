@@ -0,0 +1,90 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django_ckeditor_5 import signals as ckeditor_signals
+from django_ckeditor_5.fields import CKEditor5Field
+
+from . import models, reservations, search, site, stats
+from .cache import invalidate_model
+
+
+CACHED_MODELS = (
+    models.News,
+    models.Service,
+    models.TeamMember,
+    models.CompanyInfo,
+    models.FAQ,
+    models.Hostel,
+    models.TermsAndConditions,
+    # Not page-cached, but its pages carry ETag/Last-Modified validators.
+    models.Job,
+)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_pages(sender, **kwargs):
+    """Evict the cached public pages and validators that depend on the saved or deleted model."""
+    if sender in CACHED_MODELS:
+        # Now, so the old page is not served past this point, and again on
+        # commit, so a page rendered from the old rows in between is dropped.
+        using = kwargs.get('using')
+        invalidate_model(sender, using)
+        transaction.on_commit(lambda: invalidate_model(sender, using), using=using)
+
+
+# django_ckeditor_5 re-reads the row once per rich-text field on every save
+# to find uploads the new text no longer uses; only do that when a
+# rich-text field is written.
+pre_save.disconnect(ckeditor_signals.cleanup_unused_ckeditor_images_on_update)
+
+
+@receiver(pre_save)
+def cleanup_unused_ckeditor_images(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not any(
+        isinstance(field, CKEditor5Field) and field.name in update_fields for field in sender._meta.fields
+    ):
+        return
+    ckeditor_signals.cleanup_unused_ckeditor_images_on_update(sender, instance, update_fields=update_fields, **kwargs)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_site_context(sender, **kwargs):
+    """Make every process reload its copy of the saved or deleted singleton."""
+    if sender in site.SINGLETONS.values():
+        transaction.on_commit(site.invalidate)
+
+
+@receiver(post_save, sender=models.BookingRequest)
+def count_new_booking(sender, instance, created, raw=False, **kwargs):
+    # process_batch counts its bulk_create itself.
+    if created and not raw:
+        stats.record_new([instance])
+
+
+@receiver(post_delete, sender=models.BookingRequest)
+def release_deleted_booking_bed(sender, instance, origin=None, **kwargs):
+    # When the hostel itself is being deleted its beds and stats go with it.
+    if isinstance(origin, models.Hostel) or getattr(origin, 'model', None) is models.Hostel:
+        return
+    stats.record_deleted(instance)
+    if instance.holds_bed:
+        reservations.release_bed(instance.hostel_id)
+
+
+@receiver(post_save)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if sender in search.SEARCH_FIELDS and not kwargs.get('raw'):
+        # A save of other columns only (e.g. the admin's list_editable on a
+        # row loaded with only()) leaves the documents as they are.
+        if update_fields is not None and not search.indexed_columns(sender) & update_fields:
+            return
+        transaction.on_commit(lambda: search.index_object(instance))
+
+
+@receiver(post_delete)
+def remove_from_search_index(sender, instance, **kwargs):
+    if sender in search.SEARCH_FIELDS:
+        pk = instance.pk
+        transaction.on_commit(lambda: search.remove_object(sender, pk))
@@ -0,0 +1,59 @@
+"""Process-wide copies of the singleton rows every page may show.
+
+CompanyInfo and TermsAndConditions are loaded once per process, with their
+translated fields resolved for every language up front, and handed to the
+templates by the `site` context processor. A save or delete bumps a version
+key in the shared cache; each process compares it with the version of its
+copies and reloads them when it moved. A warm request costs one cache read
+and no query.
+"""
+import threading
+
+from django.core.cache import cache
+from django.utils import translation
+
+from . import models
+
+SINGLETONS = {
+    'company_info': models.CompanyInfo,
+    'terms': models.TermsAndConditions,
+}
+VERSION_KEY = 'site-context-version'
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def invalidate():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def _load(model):
+    obj = model.objects.order_by('pk').first()
+    if obj is not None:
+        # Fill the translation memo for every language, so the shared copy
+        # is only ever read afterwards.
+        for code in models.LANGUAGE_CODES:
+            with translation.override(code):
+                for base in model._translation_fallback:
+                    obj.get_translated_field(base)
+    return obj
+
+
+def get(name):
+    """The current `name` row (see SINGLETONS), or None if there is none."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    loaded = _loaded.get(name)
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+    with _lock:
+        loaded = _loaded.get(name)
+        if loaded is None or loaded[0] != version:
+            loaded = _loaded[name] = (version, _load(SINGLETONS[name]))
+    return loaded[1]
@@ -0,0 +1,27 @@
+"""Housekeeping for the SQLite WAL mode set up in settings.DATABASES.
+
+SQLite checkpoints the write-ahead log by itself once it holds about 1000
+pages, but only as far as no reader is still using it, so under constant
+traffic the -wal file can keep growing. wal_checkpoint (run it from cron)
+copies it back into the database file and, with TRUNCATE, empties it.
+"""
+from django.db import connections
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+def checkpoint(mode='TRUNCATE', using='default'):
+    """Checkpoint the WAL; returns (busy, frames in the WAL, frames checkpointed).
+
+    busy is 1 when readers or a writer kept the checkpoint from finishing
+    within the busy timeout; the frames are -1 when the database is not in
+    WAL mode.
+    """
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f"Unknown checkpoint mode {mode!r}")
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        raise ValueError(f"Database {using!r} is not SQLite")
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA wal_checkpoint({mode})")
+        return tuple(cursor.fetchone())
@@ -0,0 +1,179 @@
+"""collectstatic post-processing and serving of the collected files.
+
+OptimizedManifestStaticFilesStorage extends Django's manifest storage:
+
+- JPEG and PNG images are resized to STATIC_IMAGE_MAX_WIDTH and
+  recompressed before they are hashed (the result is kept only if smaller);
+- text assets (CSS, JS, SVG, ...) get precompressed .gz and, when the
+  optional `brotli` package is installed, .br siblings;
+- the bytes saved per asset are written to staticfiles-report.json
+  (printed by the staticfiles_report command).
+
+`serve` sends the collected files with the precompressed variant the client
+accepts and, for content-hashed names, a far-future immutable Cache-Control.
+"""
+import gzip
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from PIL import Image, UnidentifiedImageError
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.html', '.ttf', '.eot')
+# Below this gzip rarely pays for the extra file and request header.
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def optimize_image(content, name):
+    """Smaller JPEG/PNG bytes for `content`, or None if they would not be smaller."""
+    max_width = settings.STATIC_IMAGE_MAX_WIDTH
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image.load()
+            fmt = image.format
+    except (OSError, UnidentifiedImageError):
+        logger.warning("Cannot optimize %s: not a readable image", name)
+        return None
+    if fmt not in ('JPEG', 'PNG'):
+        return None
+    # Encode what the extension promises: some .jpg files here are really PNGs.
+    if name.lower().endswith(('.jpg', '.jpeg')):
+        fmt = 'JPEG'
+
+    if image.width > max_width:
+        image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+    buffer = BytesIO()
+    if fmt == 'JPEG':
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(
+            buffer, 'JPEG', quality=settings.STATIC_JPEG_QUALITY, optimize=True, progressive=True,
+            icc_profile=image.info.get('icc_profile'),
+        )
+    else:
+        # An alpha channel that is opaque everywhere is a quarter of the pixels for nothing.
+        if image.mode == 'RGBA' and image.getchannel('A').getextrema() == (255, 255):
+            image = image.convert('RGB')
+        image.save(buffer, 'PNG', optimize=True)
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(content) else None
+
+
+def compress(content):
+    """{'gz': bytes, 'br': bytes} of `content`; variants that do not save bytes are left out."""
+    variants = {'gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    return {ext: data for ext, data in variants.items() if len(data) < len(content)}
+
+
+class OptimizedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    report_name = 'staticfiles-report.json'
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        report = {}
+        paths = dict(paths)
+        # Optimize from the source file, never from the collected copy, so a
+        # second collectstatic does not recompress an already lossy JPEG.
+        for name, (storage, path) in list(paths.items()):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            with storage.open(path) as source:
+                content = source.read()
+            optimized = optimize_image(content, name)
+            report[name] = {'original': len(content), 'optimized': len(optimized or content)}
+            if optimized is not None:
+                self.delete(name)
+                self._save(name, ContentFile(optimized))
+                # The manifest hashes (and copies) from the optimized file.
+                paths[name] = (self, name)
+
+        hashed = {}
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name:
+                hashed[name] = hashed_name
+            yield name, hashed_name, processed
+
+        for name, hashed_name in hashed.items():
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(hashed_name) as fh:
+                content = fh.read()
+            entry = report.setdefault(name, {'original': len(content), 'optimized': len(content)})
+            if len(content) < MIN_COMPRESS_SIZE:
+                continue
+            for ext, data in compress(content).items():
+                variant = f"{hashed_name}.{ext}"
+                if self.exists(variant):
+                    self.delete(variant)
+                self._save(variant, ContentFile(data))
+                entry[ext] = len(data)
+
+        if report:
+            self.delete(self.report_name)
+            self._save(self.report_name, ContentFile(json.dumps(report, indent=1, sort_keys=True).encode()))
+
+
+@lru_cache(maxsize=None)
+def _immutable_names():
+    """Content-hashed names from the manifest; empty when the storage has none."""
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def serve(request, path):
+    """Serve a collected static file, precompressed when possible."""
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, name)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+
+    statobj = os.stat(fullpath)
+    immutable = name in _immutable_names()
+    if not immutable and not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), statobj.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, file_encoding = mimetypes.guess_type(name)
+    if content_type is None or file_encoding:
+        content_type = 'application/octet-stream'
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding = None
+    for ext, coding in (('br', 'br'), ('gz', 'gzip')):
+        if coding in accepted and os.path.isfile(f"{fullpath}.{ext}"):
+            fullpath, encoding = f"{fullpath}.{ext}", coding
+            break
+
+    response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+        response['Vary'] = 'Accept-Encoding'
+    response['Last-Modified'] = http_date(statobj.st_mtime)
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else 'public, max-age=300'
+    return response
@@ -0,0 +1,156 @@
+"""Per hostel, per day booking statistics (HostelDailyStats).
+
+The counters are updated in the same transaction as the bookings:
+
+- a new booking adds one to its status on the day it was made
+  (post_save, and process_batch for its bulk_create);
+- reservations.set_status moves one from the old status to the new one;
+- deleting a booking takes one off;
+- every bed that moves copies the hostel's beds into today's row.
+
+The admin dashboard reads only these rows, so it costs the same with a
+handful of bookings or hundreds of thousands. rebuild() recomputes the
+counters from BookingRequest (the rebuild_booking_stats command).
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import models
+
+STATUSES = ('pending', 'confirmed', 'cancelled')
+
+
+def _row(hostel_id, day):
+    row, _ = models.HostelDailyStats.objects.get_or_create(hostel_id=hostel_id, day=day)
+    return row.pk
+
+
+def _add(hostel_id, day, counts):
+    counts = {status: n for status, n in counts.items() if n}
+    if not counts:
+        return
+    if any(n > 0 for n in counts.values()):
+        rows = models.HostelDailyStats.objects.filter(pk=_row(hostel_id, day))
+    else:
+        # Only ever take off from an existing row: the hostel may be being deleted.
+        rows = models.HostelDailyStats.objects.filter(hostel_id=hostel_id, day=day)
+    rows.update(**{status: F(status) + n for status, n in counts.items()})
+
+
+def record_new(bookings):
+    """Count bookings that were just created."""
+    counts = defaultdict(Counter)
+    for booking in bookings:
+        counts[booking.hostel_id, timezone.localdate(booking.created_at)][booking.status] += 1
+    with transaction.atomic():
+        for (hostel_id, day), by_status in counts.items():
+            _add(hostel_id, day, by_status)
+
+
+def record_status_change(hostel_id, created_at, old, new):
+    if old != new:
+        _add(hostel_id, timezone.localdate(created_at), {old: -1, new: 1})
+
+
+def record_deleted(booking):
+    _add(booking.hostel_id, timezone.localdate(booking.created_at), {booking.status: -1})
+
+
+def snapshot_beds(hostel_id):
+    """Copy the hostel's current beds into today's row."""
+    hostel = models.Hostel.objects.filter(pk=OuterRef('hostel_id'))
+    # Read in the UPDATE itself, so concurrent moves cannot leave an older snapshot behind.
+    models.HostelDailyStats.objects.filter(pk=_row(hostel_id, timezone.localdate())).update(
+        total_beds=Subquery(hostel.values('total_beds')[:1]),
+        occupied_beds=Subquery(
+            hostel.annotate(occupied=F('total_beds') - F('available_beds')).values('occupied')[:1]
+        ),
+    )
+
+
+def rebuild():
+    """Recompute every counter from BookingRequest and snapshot today's beds."""
+    with transaction.atomic():
+        models.HostelDailyStats.objects.update(pending=0, confirmed=0, cancelled=0)
+        counts = defaultdict(Counter)
+        rows = (
+            models.BookingRequest.objects.annotate(day=TruncDate('created_at'))
+            .values_list('hostel_id', 'day', 'status').annotate(n=Count('pk')).order_by()
+        )
+        for hostel_id, day, status, n in rows:
+            counts[hostel_id, day][status] += n
+        for (hostel_id, day), by_status in counts.items():
+            _add(hostel_id, day, by_status)
+        for hostel_id in models.Hostel.objects.values_list('pk', flat=True):
+            snapshot_beds(hostel_id)
+    return sum(sum(by_status.values()) for by_status in counts.values())
+
+
+def dashboard(days=30):
+    """What the admin dashboard shows for the last `days` days, from HostelDailyStats only."""
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    stats = models.HostelDailyStats.objects
+
+    hostels = {
+        pk: {'unique_id': unique_id, 'name': name, 'total_beds': None, 'occupied_beds': None,
+             'occupancy_rate': None, 'total': 0, **dict.fromkeys(STATUSES, 0)}
+        for pk, unique_id, name in models.Hostel.objects.order_by('name_en').values_list('pk', 'unique_id', 'name_en')
+    }
+    for hostel_id, *counts in (
+        stats.filter(day__gte=start, day__lte=end).values_list('hostel_id')
+        .annotate(Sum('pending'), Sum('confirmed'), Sum('cancelled')).order_by()
+    ):
+        hostels[hostel_id].update(zip(STATUSES, counts), total=sum(counts))
+
+    # Bed snapshots in the window, plus each hostel's last one before it so
+    # the daily series starts from the right occupancy.
+    last_before = stats.filter(
+        hostel_id=OuterRef('hostel_id'), day__lt=start, occupied_beds__isnull=False
+    ).order_by('-day').values('day')[:1]
+    snapshots = defaultdict(list)
+    for hostel_id, day, total_beds, occupied in (
+        stats.filter(occupied_beds__isnull=False, day__lte=end)
+        .filter(Q(day__gte=start) | Q(day=Subquery(last_before)))
+        .order_by('day').values_list('hostel_id', 'day', 'total_beds', 'occupied_beds')
+    ):
+        snapshots[hostel_id].append((day, total_beds, occupied))
+    for hostel_id, items in snapshots.items():
+        _, total_beds, occupied = items[-1]
+        hostels[hostel_id].update(
+            total_beds=total_beds, occupied_beds=occupied, occupancy_rate=_rate(occupied, total_beds)
+        )
+
+    daily = {start + timedelta(days=i): Counter() for i in range(days)}
+    for day, pending, confirmed, cancelled in (
+        stats.filter(day__gte=start, day__lte=end).values_list('day')
+        .annotate(Sum('pending'), Sum('confirmed'), Sum('cancelled')).order_by()
+    ):
+        daily[day].update(pending=pending, confirmed=confirmed, cancelled=cancelled)
+    # Occupancy of the whole site per day, carrying each hostel's last snapshot forward.
+    current = {}
+    pointers = {hostel_id: 0 for hostel_id in snapshots}
+    series = []
+    for day, counts in daily.items():
+        for hostel_id, items in snapshots.items():
+            while pointers[hostel_id] < len(items) and items[pointers[hostel_id]][0] <= day:
+                current[hostel_id] = items[pointers[hostel_id]][1:]
+                pointers[hostel_id] += 1
+        total_beds = sum(total for total, _ in current.values())
+        occupied = sum(occupied for _, occupied in current.values())
+        series.append({
+            'day': day,
+            'bookings': sum(counts.values()),
+            **{status: counts[status] for status in STATUSES},
+            'occupancy_rate': _rate(occupied, total_beds),
+        })
+    return {'start': start, 'end': end, 'hostels': list(hostels.values()), 'daily': series}
+
+
+def _rate(occupied, total_beds):
+    return round(occupied / total_beds * 100, 1) if total_beds else 0
@@ -0,0 +1,64 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core.assets import ICONS_VERSION, SOURCES, VENDOR_DIR
+
+register = template.Library()
+
+ICONS_CDN = f'https://cdn.jsdelivr.net/npm/bootstrap-icons@{ICONS_VERSION}/font/bootstrap-icons.min.css'
+
+
+@lru_cache(maxsize=None)
+def _built():
+    """Whether build_vendor_assets has written static/vendor/ (checked once per process)."""
+    return finders.find(f'{VENDOR_DIR}/bootstrap.min.css') is not None
+
+
+@lru_cache(maxsize=None)
+def _critical_css():
+    path = finders.find(f'{VENDOR_DIR}/critical.css')
+    if path is None:
+        return None
+    with open(path, encoding='utf-8') as fh:
+        # Inlined into <style>: a '</' could close the element early.
+        return fh.read().replace('</', '<\\/')
+
+
+@register.simple_tag
+def vendor_styles():
+    """Bootstrap and Bootstrap Icons stylesheets for <head>.
+
+    With the self-hosted build the critical CSS is inlined and the purged
+    stylesheets load without blocking the first paint; before the first
+    build the CDN stylesheets are linked as before.
+    """
+    if not _built():
+        return format_html(
+            '<link rel="stylesheet" href="{}">\n  <link rel="stylesheet" href="{}">',
+            SOURCES['bootstrap.min.css'], ICONS_CDN,
+        )
+    bootstrap = static(f'{VENDOR_DIR}/bootstrap.min.css')
+    icons = static(f'{VENDOR_DIR}/bootstrap-icons.css')
+    critical = _critical_css()
+    if critical is None:
+        return format_html(
+            '<link rel="stylesheet" href="{}">\n  <link rel="stylesheet" href="{}">', bootstrap, icons,
+        )
+    return format_html(
+        '<style>{}</style>\n'
+        '  <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '  <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '  <noscript><link rel="stylesheet" href="{}"><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(critical), bootstrap, icons, bootstrap, icons,
+    )
+
+
+@register.simple_tag
+def vendor_scripts():
+    src = static(f'{VENDOR_DIR}/bootstrap.bundle.min.js') if _built() else SOURCES['bootstrap.bundle.min.js']
+    return format_html('<script src="{}" defer></script>', src)
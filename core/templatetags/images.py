@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from core.images import CONTENT_TYPES, srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(obj, sizes='100vw', **attrs):
+    """<picture> for the rendition_field image of `obj`.
+
+    Offers the WebP/AVIF renditions with srcset/sizes and gives the <img>
+    the intrinsic width and height so the browser reserves its box before
+    the image loads. Extra keyword arguments become <img> attributes
+    (alt, class, style, loading, ...). Falls back to the original upload
+    while the renditions are not generated yet.
+
+        {% responsive_image hostel sizes="(min-width: 992px) 33vw, 100vw" alt=hostel.name_en class="w-100" %}
+    """
+    image = getattr(obj, obj.rendition_field)
+    if not image:
+        return ''
+    description = obj.image_renditions or {}
+    current = description.get('source') == image.name and not description.get('stale')
+
+    attrs = {'loading': 'lazy', 'decoding': 'async', **attrs}
+    if current and description.get('width'):
+        attrs.setdefault('width', description['width'])
+        attrs.setdefault('height', description['height'])
+    img = format_html(
+        '<img src="{}"{}>',
+        image.url,
+        format_html_join('', ' {}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items())),
+    )
+    if not current or not description.get('formats'):
+        return img
+    # AVIF first: the browser takes the first <source> type it supports.
+    formats = sorted(description['formats'], key=lambda fmt: fmt != 'avif')
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((CONTENT_TYPES[fmt], srcset(description, fmt), sizes) for fmt in formats),
+    )
+    return format_html('<picture>{}{}</picture>', sources, img)
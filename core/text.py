@@ -0,0 +1,33 @@
+import html
+import re
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+WHITESPACE_RE = re.compile(r'\s+')
+TAG_RE = re.compile(r'<[^>]*>')
+
+
+def html_to_text(value):
+    """Plain text of CKEditor HTML: tags dropped, entities decoded, whitespace collapsed."""
+    if not value:
+        return ''
+    # Keep words from neighbouring blocks apart before the tags go away.
+    text = strip_tags(re.sub(r'<(br|/p|/div|/li|/h\d|/td|/tr)\b[^>]*>', ' ', value))
+    return WHITESPACE_RE.sub(' ', html.unescape(text)).strip()
+
+
+def strip_markup(value):
+    """Cheap html_to_text for text that is escaped again before display.
+
+    A single regex pass instead of an HTML parser; a stray '<' may survive,
+    so the result must not be marked safe.
+    """
+    if not value:
+        return ''
+    return WHITESPACE_RE.sub(' ', html.unescape(TAG_RE.sub(' ', value))).strip()
+
+
+def make_excerpt(value, length):
+    """Plain-text excerpt of at most `length` characters, cut with an ellipsis."""
+    return Truncator(html_to_text(value)).chars(length)
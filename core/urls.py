@@ -15,4 +15,6 @@ urlpatterns = [
     path('hostel/booking/<str:unique_id>/', views.hostel_booking, name='hostel_booking'),
     path('faq/', views.faq_view, name='faq'),
     path('terms/', views.terms_view, name='terms'),
+    path('search/', views.search_view, name='search'),
+    path('csrf/', views.csrf_token_view, name='csrf_token'),
 ]
@@ -1,68 +1,91 @@
 
-from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
-from . import models  
-from datetime import datetime
-from django.utils.translation import get_language, gettext as _
-
-
-def home(request):
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, aget_object_or_404
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from . import db, intake, models, reservations, search
+from .cache import cache_public_page, conditional_page
+from .pagination import KeysetPage, KeysetPaginator
+from django.utils.translation import gettext as _
+
+
+async def arender(request, template_name, context=None):
+    """render() for the async views.
+
+    Django templates render synchronously, and may still load company_info
+    and terms (site_context), so they run in the request's worker thread.
+    """
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@conditional_page(models.News)
+@cache_public_page('home')
+async def home(request):
     # Fetch recent news items (latest 5) for the home page
-    recent_news = models.News.objects.exclude(unique_id="").order_by('-created_at')[:5]
+    recent_news = [news async for news in models.News.objects.exclude(unique_id="").order_by('-created_at')[:5]]
     context = {
         'recent_news': recent_news
     }
-    return render(request, 'core/home.html', context)
-
-def about(request):
-    try:
-        company_info = models.CompanyInfo.objects.get()
-    except models.CompanyInfo.DoesNotExist:
-        company_info = None
-    return render(request, "core/about.html", {"company_info": company_info})
-
-def services(request):
-    services_list = models.Service.objects.all().order_by('order', 'created_at')
-    return render(request, "core/services.html", {"services": services_list})
-
-def news_home(request):
+    return await arender(request, 'core/home.html', context)
+
+@conditional_page(models.CompanyInfo)
+@cache_public_page('about')
+async def about(request):
+    # company_info comes from the site_context context processor.
+    return await arender(request, "core/about.html")
+
+@conditional_page(models.Service)
+@cache_public_page('services')
+async def services(request):
+    services_list = [service async for service in models.Service.objects.all().order_by('order', 'created_at')]
+    return await arender(request, "core/services.html", {"services": services_list})
+
+@conditional_page(models.News)
+@cache_public_page('news')
+async def news_home(request):
     """Fetch the latest, trending, and all news for display."""
-    all_news = models.News.objects.exclude(unique_id="").order_by('-created_at')
-    
-    # Get top news (most recent)
-    top_news = all_news.first() if all_news.exists() else None
-    
-    # Get latest news list (excluding top news if it exists)
-    if top_news:
-        latest_news_list = all_news[1:]
-    else:
-        latest_news_list = all_news
-    
-    # Get trending news (top 5)
-    trending_news = all_news[:5]
-
-    # Pagination for latest_news (6 per page)
-    paginator = Paginator(latest_news_list, 6)
-    page_number = request.GET.get('page')
-    latest_news = paginator.get_page(page_number)
+    all_news = (
+        models.News.objects.exclude(unique_id="")
+        .with_translations('header', 'excerpt')
+        .without_translations('content')
+        .order_by('-created_at', '-pk')
+    )
+    cursor = request.GET.get('cursor')
+    per_page = 6
+
+    # Top news and the trending list (top 5) come from the head of the list;
+    # on the first page the same fetch also covers the first page of the rest.
+    head = [news async for news in (all_news[:max(5, per_page + 2)] if not cursor else all_news[:5])]
+    top_news = head[0] if head else None
+    trending_news = head[:5]
+
+    # Keyset pagination for latest_news (6 per page), excluding the top news
+    latest_news_list = all_news.exclude(pk=top_news.pk) if top_news else all_news
+    paginator = KeysetPaginator(latest_news_list, per_page)
+    latest_news = await paginator.aget_page(cursor, first_rows=head[1:] if not cursor else None)
 
     context = {
         'top_news': top_news,
         'latest_news': latest_news,
         'trending_news': trending_news
     }
-    return render(request, 'core/news.html', context)
+    return await arender(request, 'core/news.html', context)
 
-def news_detail(request, unique_id):
+@conditional_page(models.News)
+async def news_detail(request, unique_id):
     """Fetch a specific news article by unique_id."""
-    news = get_object_or_404(models.News, unique_id=unique_id)
-    return render(request, 'core/news_detail.html', {'news': news})
+    news = await aget_object_or_404(models.News, unique_id=unique_id)
+    return await arender(request, 'core/news_detail.html', {'news': news})
 
-def team_view(request):
+@conditional_page(models.TeamMember)
+@cache_public_page('team')
+async def team_view(request):
     """View to display all team members."""
     # Get CEO member
-    ceo = models.TeamMember.objects.filter(is_ceo=True).first()
+    ceo = await models.TeamMember.objects.filter(is_ceo=True).afirst()
     
     # Get other team members (exclude CEO if found)
     if ceo:
@@ -70,109 +93,128 @@ def team_view(request):
     else:
         team_members = models.TeamMember.objects.all().order_by('created_at')
     
-    return render(request, "core/team.html", {"ceo": ceo, "team_members": team_members})
+    team_members = [member async for member in team_members]
+    return await arender(request, "core/team.html", {"ceo": ceo, "team_members": team_members})
 
-def contact(request):
-    try:
-        company_info = models.CompanyInfo.objects.get()
-    except models.CompanyInfo.DoesNotExist:
-        company_info = None
-    
+@conditional_page(models.CompanyInfo)
+async def contact(request):
     if request.method == 'POST':
         from django.contrib import messages
         
         try:
-            # Save contact message
-            models.ContactMessage.objects.create(
-                name=request.POST.get('name'),
-                email=request.POST.get('email'),
-                phone=request.POST.get('phone'),
-                purpose=request.POST.get('purpose'),
-                message=request.POST.get('message')
-            )
-            
+            # The write runs in a worker thread, off the event loop.
+            await sync_to_async(intake.enqueue_contact)(request.POST)
             messages.success(request, _('Thank you for your message! We have received your inquiry and will contact you soon.'))
-            
-        except Exception as e:
+        except ValidationError:
             messages.error(request, _('Sorry, there was an error submitting your message. Please try again later.'))
     
-    return render(request, 'core/contact.html', {'company_info': company_info})
+    return await arender(request, 'core/contact.html')
 
-def job_list_view(request):
-    query = request.GET.get('q', '')
-    lang = get_language()  # will return 'en', 'ja', or 'ne'
-
-    # Dynamically pick the translated header field based on current language
-    header_field = f'header_{lang}'
-    
-    job_list = models.Job.objects.all()
+@conditional_page(models.Job)
+async def job_list_view(request):
+    query = request.GET.get('q', '').strip()
 
     if query:
-        filter_kwargs = {f'{header_field}__icontains': query}
-        job_list = job_list.filter(**filter_kwargs)
-
-    job_list = job_list.order_by('-created_at')
-
-    paginator = Paginator(job_list, 10)
-    page = request.GET.get('page', 1)
-
-    try:
-        jobs = paginator.page(page)
-    except PageNotAnInteger:
-        jobs = paginator.page(1)
-    except EmptyPage:
-        jobs = paginator.page(paginator.num_pages)
+        # Ranked full-text matches across all three languages, on one page.
+        jobs = KeysetPage(
+            await sync_to_async(search.search_objects)(query, models.Job, limit=settings.SEARCH_RESULT_LIMIT)
+        )
+    else:
+        job_list = models.Job.objects.with_translations('header', 'attract_point', 'excerpt').without_translations('content')
+        paginator = KeysetPaginator(job_list, 10)
+        jobs = await paginator.aget_page(request.GET.get('cursor'))
 
-    return render(request, 'core/job_list.html', {'jobs': jobs, 'query': query})
+    return await arender(request, 'core/job_list.html', {'jobs': jobs, 'query': query})
 
-def job_detail_view(request, unique_id):
+@conditional_page(models.Job)
+async def job_detail_view(request, unique_id):
     # Retrieve the job object based on the unique_id
-    job = get_object_or_404(models.Job, unique_id=unique_id)
+    job = await aget_object_or_404(models.Job, unique_id=unique_id)
     
     
     context = {
         'job': job
     }
-    return render(request, 'core/job_detail.html', context)
-
-def hostel_view(request):
-    hostels = models.Hostel.objects.filter(is_active=True).order_by('-created_at')
-    return render(request, 'core/hostel.html', {'hostels': hostels})
-
-def hostel_booking(request, unique_id):
+    return await arender(request, 'core/job_detail.html', context)
+
+@conditional_page(models.Hostel)
+@cache_public_page('hostel')
+async def hostel_view(request):
+    hostels = (
+        models.Hostel.objects.filter(is_active=True)
+        .with_translations('name', 'address', 'excerpt')
+        .without_translations('features')
+        .order_by('-created_at')
+    )
+    hostels = [hostel async for hostel in hostels]
+    return await arender(request, 'core/hostel.html', {'hostels': hostels})
+
+@conditional_page(models.Hostel)
+async def hostel_booking(request, unique_id):
     """Handle hostel booking form submission"""
-    hostel = get_object_or_404(models.Hostel, unique_id=unique_id, is_active=True)
+    hostel = await aget_object_or_404(models.Hostel, unique_id=unique_id, is_active=True)
     
     if request.method == 'POST':
         from django.contrib import messages
         from django.shortcuts import redirect
         
-        booking = models.BookingRequest.objects.create(
-            hostel=hostel,
-            customer_name=request.POST.get('customer_name'),
-            phone_number=request.POST.get('phone_number'),
-            current_address=request.POST.get('current_address'),
-            email=request.POST.get('email'),
-            message=request.POST.get('message', ''),
-            user=request.user if request.user.is_authenticated else None
-        )
+        user = await request.auser()
+        try:
+            # The bed is held and the booking queued in a worker thread, off the event loop.
+            await sync_to_async(intake.enqueue_booking)(
+                hostel,
+                request.POST,
+                user=user if user.is_authenticated else None,
+            )
+        except ValidationError:
+            messages.error(request, _('Sorry, there was an error submitting your message. Please try again later.'))
+            return redirect('hostel')
+        except reservations.NoBedsAvailable:
+            messages.error(request, _('Sorry, there are no beds available at this hostel right now.'))
+            return redirect('hostel')
         
         messages.success(request, _('Thank you for your booking request! Our staff will contact you soon via email or phone to confirm your reservation.'))
         return redirect('hostel')
     
-    return render(request, 'core/hostel.html', {'hostels': models.Hostel.objects.filter(is_active=True)})
-
-def faq_view(request):
+    hostels = (
+        models.Hostel.objects.filter(is_active=True)
+        .with_translations('name', 'address', 'excerpt')
+        .without_translations('features')
+    )
+    hostels = [hostel async for hostel in hostels]
+    return await arender(request, 'core/hostel.html', {'hostels': hostels})
+
+@conditional_page(models.FAQ)
+@cache_public_page('faq')
+async def faq_view(request):
     """Display all active FAQs"""
-    faqs = models.FAQ.objects.filter(is_active=True).order_by('order', 'created_at')
-    return render(request, 'core/faq.html', {'faqs': faqs})
-
-def terms_view(request):
-    """Display Terms & Conditions"""
-    try:
-        terms = models.TermsAndConditions.objects.get()
-    except models.TermsAndConditions.DoesNotExist:
-        terms = None
-    return render(request, 'core/terms.html', {'terms': terms})
-
-
+    faqs = (
+        models.FAQ.objects.filter(is_active=True)
+        .with_translations('question', 'answer')
+        .order_by('order', 'created_at')
+    )
+    faqs = [faq async for faq in faqs]
+    return await arender(request, 'core/faq.html', {'faqs': faqs})
+
+@conditional_page(models.News, models.Job, models.Service, models.FAQ, models.Hostel)
+async def search_view(request):
+    """Search across news, careers, services, FAQs and hostels"""
+    query = request.GET.get('q', '').strip()
+    results = await sync_to_async(search.site_search)(query, limit=settings.SEARCH_RESULT_LIMIT) if query else []
+    return await arender(request, 'core/search.html', {'query': query, 'results': results})
+
+@conditional_page(models.TermsAndConditions)
+@cache_public_page('terms')
+async def terms_view(request):
+    """Display Terms & Conditions (terms comes from the site_context context processor)"""
+    return await arender(request, 'core/terms.html')
+
+@never_cache
+async def csrf_token_view(request):
+    """CSRF token for the forms of pages exported by export_static (see csrf.js)"""
+    return JsonResponse({'token': get_token(request)})
+
+@never_cache
+def db_stats(request):
+    """Connection and pool metrics of this worker process (staff only, see fishtail/urls.py)"""
+    return JsonResponse(db.connection_stats())
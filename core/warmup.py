@@ -0,0 +1,51 @@
+"""Compile the project templates ahead of the first request.
+
+The TEMPLATES loaders are wrapped in the cached loader, so a template parsed
+once stays compiled for the life of the process. warm_templates() parses all
+of them up front; fishtail/wsgi.py and asgi.py call it (through the
+warm_templates command) when WARM_TEMPLATES is on, so with gunicorn's
+--preload the workers fork with the templates already compiled.
+"""
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+
+
+def template_names():
+    """Loader names of the templates in templates/ and core/templates/core/."""
+    directories = [Path(directory) for directory in settings.TEMPLATES[0]['DIRS']]
+    directories.append(Path(apps.get_app_config('core').path, 'templates'))
+    names = set()
+    for directory in directories:
+        for path in directory.rglob('*.html'):
+            names.add(path.relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def django_engine():
+    return engines['django'].engine
+
+
+def reset_templates(engine=None):
+    """Drop the compiled templates, as a fresh process would start."""
+    for loader in (engine or django_engine()).template_loaders:
+        if hasattr(loader, 'reset'):
+            loader.reset()
+
+
+def warm_templates(names=None, engine=None):
+    """Compile `names` (default: template_names()) into the cached loader.
+
+    Returns {name: seconds spent compiling}. A template with a syntax error
+    raises TemplateSyntaxError, so a broken deploy fails at start-up.
+    """
+    engine = engine or django_engine()
+    timings = {}
+    for name in names or template_names():
+        start = time.perf_counter()
+        engine.get_template(name)
+        timings[name] = time.perf_counter() - start
+    return timings
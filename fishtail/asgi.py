@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+from django.core.management import call_command
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
+# Tells settings.py to default DATABASE_CONN_MAX_AGE to 0 (see there).
+os.environ['ASGI'] = '1'
 
 application = get_asgi_application()
+
+if settings.WARM_TEMPLATES:
+    call_command('warm_templates', verbosity=0)
@@ -139,8 +139,8 @@ CKEDITOR_5_CONFIGS = {
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',  # Required for language storage
-    'django.middleware.locale.LocaleMiddleware',  # Enables language switching
+    'core.middleware.StaffSessionMiddleware',  # Sessions for the admin only
+    'django.middleware.locale.LocaleMiddleware',  # Language from the URL prefix and django_language cookie
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -155,14 +155,25 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],  # Add the global templates folder
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates stay in memory for the life of the process,
+            # whatever DEBUG says; runserver's autoreloader still resets the
+            # cache when a template file changes.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 # default context processors
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.navigation',
+                'core.context_processors.fragment_cache',
+                'core.context_processors.site_context',
             ],
         },
     },
@@ -181,6 +192,22 @@ if DATABASE_ENGINE == 'django.db.backends.sqlite3':
         'default': {
             'ENGINE': DATABASE_ENGINE,
             'NAME': BASE_DIR / os.environ.get('DATABASE_NAME', 'db.sqlite3'),
+            # Run on every new connection: WAL lets readers and the writer work
+            # side by side, synchronous=NORMAL is safe with WAL, and a busy
+            # writer is waited for instead of failing with "database is locked".
+            # Writes start with BEGIN IMMEDIATE, so a transaction takes the write
+            # lock up front rather than failing when it upgrades from a read.
+            'OPTIONS': {
+                'init_command': ';'.join([
+                    f"PRAGMA journal_mode={os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+                    f"PRAGMA synchronous={os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+                    f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000'))}",
+                    f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)))}",
+                    # Negative: KiB rather than pages.
+                    f"PRAGMA cache_size={int(os.environ.get('SQLITE_CACHE_SIZE', '-20000'))}",
+                ]),
+                'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            },
         }
     }
 else:
@@ -195,6 +222,104 @@ else:
         }
     }
 
+# Connections are kept for DATABASE_CONN_MAX_AGE seconds (0 closes them after
+# every request, empty keeps them open) and checked before being reused.
+# Under ASGI (fishtail/asgi.py sets ASGI=1) the default is 0: async views run
+# their database work in varying threads, each with its own connection, so
+# kept connections would pile up.
+# DATABASE_POOL=True gives every worker process a psycopg 3 connection pool
+# instead (PostgreSQL only, needs psycopg[pool]); the pool keeps the
+# connections, so they are handed back after every request.
+_conn_max_age = os.environ.get('DATABASE_CONN_MAX_AGE', '0' if os.environ.get('ASGI') == '1' else '60')
+DATABASES['default']['CONN_MAX_AGE'] = int(_conn_max_age) if _conn_max_age else None
+DATABASES['default']['CONN_HEALTH_CHECKS'] = os.environ.get('DATABASE_CONN_HEALTH_CHECKS', 'True') == 'True'
+if DATABASE_ENGINE == 'django.db.backends.postgresql' and os.environ.get('DATABASE_POOL', 'False') == 'True':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', '10')),
+            # Seconds a request waits for a free connection before failing.
+            'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', '10')),
+        },
+    }
+
+# Read replicas for the public pages (core.routers), comma separated:
+# host[:port] of PostgreSQL standbys, or SQLite files (e.g. a copy of
+# db.sqlite3 as a local stand-in). They become the aliases replica1, ...
+DATABASE_REPLICAS = [name.strip() for name in os.environ.get('DATABASE_REPLICAS', '').split(',') if name.strip()]
+for _number, _replica in enumerate(DATABASE_REPLICAS, 1):
+    _config = {
+        **DATABASES['default'],
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DATABASE_ENGINE == 'django.db.backends.sqlite3':
+        _config['NAME'] = BASE_DIR / _replica
+    else:
+        _host, _, _port = _replica.partition(':')
+        _config.update(HOST=_host, PORT=_port or _config['PORT'])
+    DATABASES[f'replica{_number}'] = _config
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+    MIDDLEWARE.insert(1, 'core.middleware.replica_middleware')
+# 'round_robin' or 'least_latency' (of the last health check).
+REPLICA_SELECTION = os.environ.get('REPLICA_SELECTION', 'round_robin')
+# After a write, every read goes to the primary for this long (the replica lag to allow for).
+REPLICA_LAG_SECONDS = float(os.environ.get('REPLICA_LAG_SECONDS', '2'))
+# Seconds between the health checks of a replica, per process.
+REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', '10'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Use a shared backend (e.g. Redis or Memcached) in production so page
+# invalidation reaches every worker process.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'fishtail'),
+    },
+    # {% cache %} fragments (header, footer, list cards). Bump
+    # FRAGMENT_CACHE_VERSION on deploys that change those templates.
+    'template_fragments': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'fishtail'),
+        'KEY_PREFIX': 'fragment',
+        'VERSION': int(os.environ.get('FRAGMENT_CACHE_VERSION', '1')),
+    },
+}
+
+# Seconds a rendered public page stays cached; saving a model evicts it earlier.
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', '86400'))
+# Card fragments are keyed by (pk, updated_at), so they never need evicting.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', '86400'))
+
+
+# Compile every project template when the WSGI/ASGI application loads (the
+# warm_templates command), so no worker parses a template on a request.
+WARM_TEMPLATES = os.environ.get('WARM_TEMPLATES', str(not DEBUG)) == 'True'
+
+
+# Public unique_id allocation: 'core.ids.RandomIdAllocator' (default) or
+# 'core.ids.SequenceIdAllocator' (collision-free, needs the IdSequence table).
+UNIQUE_ID_ALLOCATOR = os.environ.get('UNIQUE_ID_ALLOCATOR', 'core.ids.RandomIdAllocator')
+
+
+# Full-text search backend: 'sqlite' (FTS5), 'postgresql' (tsvector + GIN) or
+# 'database' (plain icontains). Empty picks the one matching DATABASE_ENGINE.
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', '')
+SEARCH_RESULT_LIMIT = int(os.environ.get('SEARCH_RESULT_LIMIT', '50'))
+
+
+# Resized renditions of uploaded images (see core/images.py). 'avif' needs a
+# Pillow build that can write it (Pillow >= 11.2 or pillow-avif-plugin).
+IMAGE_RENDITION_WIDTHS = (160, 320, 640, 960, 1280, 1920)
+IMAGE_RENDITION_FORMATS = tuple(
+    fmt.strip() for fmt in os.environ.get('IMAGE_RENDITION_FORMATS', 'webp').split(',') if fmt.strip()
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -237,6 +362,23 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# collectstatic resizes/recompresses images, precompresses CSS/JS and writes
+# content-hashed names (core/staticfiles.py). Hashed URLs are only used when
+# DEBUG is False, after collectstatic has run.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': os.environ.get('STATICFILES_STORAGE', 'core.staticfiles.OptimizedManifestStaticFilesStorage'),
+    },
+}
+STATIC_IMAGE_MAX_WIDTH = int(os.environ.get('STATIC_IMAGE_MAX_WIDTH', '1920'))
+STATIC_JPEG_QUALITY = int(os.environ.get('STATIC_JPEG_QUALITY', '82'))
+# Let Django serve STATIC_ROOT itself (precompressed, with immutable cache
+# headers) when no front-end web server does it.
+SERVE_STATIC = os.environ.get('SERVE_STATIC', 'False') == 'True'
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -256,19 +398,30 @@ LANGUAGES = [
 # LANGUAGE_CODE and TIME_ZONE moved to bottom
 USE_L10N = True
 
-# Enable session-based language storage
+# The language lives in the URL prefix and this cookie, never in the session.
 LANGUAGE_COOKIE_NAME = 'django_language'
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Store session in the database
+# Only these paths (after the language prefix) get a session; the public
+# pages do no session I/O at all (core.middleware.StaffSessionMiddleware).
+SESSION_PATHS = ('admin/', 'ckeditor5/')
+# POSTs to these read the session too, to know who is logged in; a visitor
+# without a sessionid cookie still costs no session I/O.
+SESSION_POST_PATHS = ('hostel/booking/',)
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+# Flash messages travel in a signed cookie instead of the session.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
 
 LOCALE_PATHS = [
     BASE_DIR / "locale",  # Correctly use Path object for the locale directory
 ]
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'  # Change this to your SMTP server
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# Notifications are sent by the process_intake worker, never inside a request.
+# For local testing run `python manage.py smtp_sink` and set EMAIL_HOST=localhost,
+# EMAIL_PORT=1025, EMAIL_USE_TLS=False.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')  # Change this to your SMTP server
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '587'))
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')  # Your email
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')  # Your password
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@fishtailhomes.com')
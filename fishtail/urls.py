@@ -15,12 +15,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf.urls.i18n import i18n_patterns
 from django.conf import settings
 from django.conf.urls.static import static
+from core import staticfiles, views
 
 urlpatterns = i18n_patterns(
+    path('admin/db-stats/', admin.site.admin_view(views.db_stats), name='db_stats'),
     path('admin/', admin.site.urls),
     path('', include('core.urls')),  # Main app URLs
     path('i18n/', include('django.conf.urls.i18n')),  # Language switching
@@ -30,3 +32,5 @@ urlpatterns = i18n_patterns(
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+elif settings.SERVE_STATIC:
+    urlpatterns += [re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), staticfiles.serve)]
@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
+from django.core.management import call_command
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fishtail.settings')
 
 application = get_wsgi_application()
+
+if settings.WARM_TEMPLATES:
+    call_command('warm_templates', verbosity=0)
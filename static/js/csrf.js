@@ -0,0 +1,24 @@
+// Pages exported by export_static carry no CSRF token (it belongs to one
+// visitor's cookie). Before such a form posts, fetch the visitor's own token.
+document.addEventListener('submit', function (event) {
+  var form = event.target;
+  var input = form.querySelector('input[name="csrfmiddlewaretoken"]');
+  if (!input || input.value) {
+    return;
+  }
+  event.preventDefault();
+  var submitter = event.submitter;
+  fetch(document.body.dataset.csrfUrl, {credentials: 'same-origin'})
+    .then(function (response) { return response.json(); })
+    .then(function (data) {
+      form.querySelectorAll('input[name="csrfmiddlewaretoken"]').forEach(function (field) {
+        field.value = data.token;
+      });
+      // requestSubmit keeps the clicked button's name/value (the language switcher needs it).
+      if (form.requestSubmit) {
+        form.requestSubmit(submitter);
+      } else {
+        form.submit();
+      }
+    });
+});